@@ -1,12 +1,16 @@
 # %% Import Packages
 # Import native packages
+import heapq
 import os
+import threading
+import numpy as np
 import pandas as pd
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
 # Import 3rd party packages
 import norgatedata
-import ta
 
 # Import my local files
 import utils.indicator_utils as ind
@@ -20,6 +24,13 @@ from utils.api_utils import (
 from utils.data_utils import (
     getData,
     getData_endDate,
+    getData_many,
+    getBarData,
+    get_watchlist_symbols,
+    stack_bar_panels,
+    tail_bars,
+    bars_complete,
+    clear_data_cache,
     get_last_friday_of_month,
     get_last_friday_of_previous_month,
 )
@@ -62,16 +73,37 @@ admin_list = ["matthewswills1@gmail.com"]
 
 # Set Strategy Name Variables
 mr_strategy_name = "MWT-LIVE-MR-SP500-v1"
+mr_strategy_id = os.environ.get(mr_strategy_name)
 mr_strategy_type = "MR"
 
 rot_strategy_name = "MWT-LIVE-MOMO-v1"
+rot_strategy_id = os.environ.get(rot_strategy_name)
 rot_strategy_type = "ROT"
 
 hft_strategy_name = "MWT-LIVE-HFT-R1000-v1"
+hft_strategy_id = os.environ.get(hft_strategy_name)
 hft_strategy_type = "HFT"
 
 dataOK = True
 
+# Read the clock once so every date in the run (data end dates, file names, email subject) agrees
+TODAY = dt.date.today()
+TODAY_DASH = TODAY.strftime("%d-%m-%Y")
+TODAY_SLASH = TODAY.strftime("%d/%m/%Y")
+
+# Fetches memoized by an earlier run in this session may predate the latest Norgate update
+clear_data_cache()
+
+# Worker threads used to fetch and scan symbols concurrently
+scan_workers = 24
+print_lock = threading.Lock()
+
+
+def log(msg):
+    """Print from scan worker threads without interleaving lines."""
+    with print_lock:
+        print(msg)
+
 # %% Set Strategy Variables
 ##################################################### Strategy Allocations ################################################
 # Account Leverage Safety Buffer 0.1 -> 10%
@@ -152,6 +184,7 @@ momo_universe = "NASDAQ 100"
 momo_index_symbol = "#NYSEHL"
 
 momo_indexPeriod = 13
+momo_bullmkt_enabled = False  # index regime filter; when off there are no entries and the universe scan is skipped
 momo_maxPos = 3
 momo_worstRank = 5
 momo_rocP1 = 120
@@ -166,6 +199,7 @@ growth_worstRank = 2
 growth_rocP1 = 75
 growth_rocP2 = 150
 growth_sinceTrue = 5
+growth_trend_enabled = False  # ROC trend filter; when off there are no entries and the universe scan is skipped
 growth_minBars = 250
 
 def_entry_allowed = True
@@ -175,12 +209,14 @@ def_worstRank = 1
 def_rocP1 = 75
 def_rocP2 = 150
 def_sinceTrue = 5
+def_trend_enabled = False  # ROC trend filter; when off there are no entries and the universe scan is skipped
 def_minBars = 250
 
 btc_entry_allowed = True
 btc_universe = ["IBIT"]
 btc_rocPeriod = 40
 btc_sinceTrue = 4
+btc_trend_enabled = False  # ROC trend filter; when off any open position is sold and no data is fetched
 btc_min_bars = 50
 
 # %% Import User Account Informaiton
@@ -197,19 +233,28 @@ else:
     print("No open positions found or an error occurred.")
 
 # %% Establish open positions for rotation type strategies
-df = pd.DataFrame(trade_records)
+# Build the trades frame once; later sections filter it rather than rebuilding from trade_records
+# Quantity and Execution Price arrive numeric from fetch_open_positions; parse the open time once here as well
+trade_df = pd.DataFrame(trade_records)
+trade_df["OpenedDateTime"] = pd.to_datetime(trade_df["Opened DateTime"], errors="coerce")
 
 #%%
 
 # Filter for the current user
-df = df[df["User"] == utm_userName].copy()
+df = trade_df[trade_df["User"] == utm_userName]
+
+def empty_trades_df():
+    """Empty Symbol/Quantity trades frame with the same dtypes as a filtered positions frame."""
+    return pd.DataFrame({"Symbol": pd.Series(dtype="object"), "Quantity": pd.Series(dtype="int64")})
+
+# Rotation trades default to empty frames so the strategy logic runs when nothing is held
+momoTrades = empty_trades_df()
+growthTrades = empty_trades_df()
+defTrades = empty_trades_df()
+btcTrades = empty_trades_df()
 
 totalOpenPosCost = 0
 if not df.empty:
-    # Convert Quantity to a numeric value from a string so the filtering will work
-    df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
-    df["Execution Price"] = pd.to_numeric(df["Execution Price"], errors="coerce")
-
     totalOpenPosCost = (df["Quantity"] * df["Execution Price"]).sum()
 
     # Extract open momo-based positions
@@ -237,8 +282,9 @@ if not df.empty:
     ].copy()
 
 # Extract open positions for MOMO and mr --> for the mr and hft Strategies
-momo_positions = set(df[df["Strategy"] == rot_strategy_name]["Symbol"].tolist())
-mr_positions = set(df[df["Strategy"] == mr_strategy_name]["Symbol"].tolist())
+# Symbol frozensets: the conflict checks below are membership tests only and never modify them
+momo_positions = frozenset(df.loc[df["Strategy"] == rot_strategy_name, "Symbol"])
+mr_positions = frozenset(df.loc[df["Strategy"] == mr_strategy_name, "Symbol"])
 
 
 # %% Determine total size of the capital pool
@@ -247,57 +293,40 @@ totalBuyingPower = buyingPower + totalOpenPosCost
 usableCapital = (1 - buffer) * totalBuyingPower
 
 # %% Find dataEndDate of monthly systems
-today = dt.date.today()
-yesterday = today - dt.timedelta(days=1)
+yesterday = TODAY - dt.timedelta(days=1)
 
-last_friday_current_month = get_last_friday_of_month(today)
-last_friday_previous_month = get_last_friday_of_previous_month(today)
+last_friday_current_month = get_last_friday_of_month(TODAY)
+last_friday_previous_month = get_last_friday_of_previous_month(TODAY)
 
-if today > last_friday_current_month:
+if TODAY > last_friday_current_month:
     data_end_date = last_friday_current_month
 else:
     data_end_date = last_friday_previous_month
 dataEndDate = data_end_date
 
 # %% Run Momo (Stocks) Strategy
-# Helper to guarantee a trades DF exists with required cols
-def ensure_trades_df(var_name, cols=('Symbol', 'Quantity')):
-    g = globals()
-    if var_name not in g or not isinstance(g[var_name], pd.DataFrame):
-        g[var_name] = pd.DataFrame(columns=list(cols))
-    else:
-        # ensure required columns exist
-        for c in cols:
-            if c not in g[var_name].columns:
-                g[var_name][c] = pd.Series(dtype='object')
-    return g[var_name]
-
-# Make sure all trades DFs exist before any strategy logic runs
-momoTrades   = ensure_trades_df('momoTrades',   cols=('Symbol','Quantity'))
-growthTrades = ensure_trades_df('growthTrades', cols=('Symbol','Quantity'))
-defTrades    = ensure_trades_df('defTrades',    cols=('Symbol','Quantity'))
-btcTrades    = ensure_trades_df('btcTrades',    cols=('Symbol','Quantity'))
-
-momo_list = []
-momo_tickerList = norgatedata.watchlist_symbols(momo_universe)
-indexData = getData_endDate(momo_index_symbol, momo_indexPeriod+5, dataEndDate).Close
-momo_bullmkt = False #indexData.iloc[-1] > indexData.iloc[-1 - momo_indexPeriod]
-
-for symbol in momo_tickerList:
+# The index regime filter gates every entry, so the universe scan is skipped entirely while it is off
+momo_bullmkt = False
+if momo_bullmkt_enabled:
+    indexData = getData_endDate(momo_index_symbol, momo_indexPeriod+5, dataEndDate).Close
+    momo_bullmkt = indexData.iloc[-1] > indexData.iloc[-1 - momo_indexPeriod]
+
+def _scan_momo(symbol):
+    """Fetch and rank a single MOMO symbol, returning its ranking entry or None."""
     try:
         data = getData_endDate(symbol, momo_minBars + 1, dataEndDate)
         lastDate = data.index[-1]
     except:
-        continue
+        return None
 
     if len(data) < momo_minBars:
-        print('MOMO_Stocks ----------->>    not enough bars for ' + symbol)
-        continue
-    print('MOMO_Stocks - Scanning   ' + symbol + '   ' + str(data.index[-1]))
+        log('MOMO_Stocks ----------->>    not enough bars for ' + symbol)
+        return None
+    log('MOMO_Stocks - Scanning   ' + symbol + '   ' + str(data.index[-1]))
 
     date = data.index[-1].strftime("%d/%m/%Y")
     c = data.Close.iloc[-1]
-    momo_ma = ta.trend.SMAIndicator(data.Close, momo_maPeriod, True).sma_indicator().iloc[-1]
+    momo_ma = ind.sma_last(data.Close.values, momo_maPeriod)
     momo_upTrend = c > momo_ma
     momo_factor = 0.5*ind.ROC(data.Close, momo_rocP1) + 0.5*ind.ROC(data.Close, int(momo_rocP2))
 
@@ -310,9 +339,16 @@ for symbol in momo_tickerList:
         and momo_factor > 0
         and momo_upTrend
         ):
-        momo_list.append(rankingEntry)
+        return rankingEntry
+    return None
 
-sorted_momo_list = sorted(momo_list, key=lambda x: x[4], reverse=True)[:momo_worstRank]
+momo_list = []
+if momo_bullmkt:
+    momo_tickerList = get_watchlist_symbols(momo_universe)
+    with ThreadPoolExecutor(max_workers=scan_workers) as executor:
+        momo_list = [entry for entry in executor.map(_scan_momo, momo_tickerList) if entry is not None]
+
+sorted_momo_list = heapq.nlargest(momo_worstRank, momo_list, key=lambda x: x[4])
 
 # Generate Entries and exits for momo System
 
@@ -330,37 +366,22 @@ hold_symbols = momo_df['Symbol'].head(momo_worstRank).tolist()
 # Identify symbols in the top 3
 entry_symbols = momo_df['Symbol'].head(momo_maxPos).tolist()
 
-# Determine Sell Orders
-momo_sell_orders = []
-for _, row in momoTrades.iterrows():
-    symbol = row['Symbol']
-    current_quantity = int(row['Quantity'])  # Fetch current holding quantity
-    if symbol not in hold_symbols and current_quantity > 0:  # Sell if the symbol is not in the top 5
-        momo_sell_orders.append([
-            symbol,                   # symbol
-            "SELL",                   # tradeAction
-            current_quantity,         # quantity matches current holdings
-            None,                     # limitPrice
-            "OPG",                    # duration
-            "Market",                 # orderType
-            'false'                   # allOrNone
-        ])
-
-# Determine Buy Orders
+# Determine Sell Orders - sell if the symbol is not in the top 5
+momo_held_quantity = momoTrades['Quantity'].astype(int)  # current holding quantity
+momo_sell_mask = ~momoTrades['Symbol'].isin(hold_symbols) & (momo_held_quantity > 0)
+momo_sell_orders = [
+    [symbol, "SELL", int(quantity), None, "OPG", "Market", 'false']
+    for symbol, quantity in zip(momoTrades.loc[momo_sell_mask, 'Symbol'], momo_held_quantity[momo_sell_mask])
+]
+
+# Determine Buy Orders - buy only if in top 3 and not already held
 momo_buy_orders = []
 if momo_entry_allowed:
-    for _, row in momo_df.iterrows():
-        symbol = row['Symbol']
-        if symbol in entry_symbols and symbol not in current_positions:  # Buy only if in top 3 and not already held
-            momo_buy_orders.append([
-                symbol,                   # symbol
-                "BUY",                    # tradeAction
-                int(row['Quantity']),     # quantity
-                None,                     # limitPrice
-                "OPG",                    # duration
-                "Market",                 # orderType
-                'false'                   # allOrNone
-            ])
+    momo_buy_mask = momo_df['Symbol'].isin(entry_symbols) & ~momo_df['Symbol'].isin(current_positions)
+    momo_buy_orders = [
+        [symbol, "BUY", int(quantity), None, "OPG", "Market", 'false']
+        for symbol, quantity in zip(momo_df.loc[momo_buy_mask, 'Symbol'], momo_df.loc[momo_buy_mask, 'Quantity'])
+    ]
 
 # Combine sell and buy orders into a single DataFrame
 columns = ['symbol', 'tradeAction', 'quantity', 'limitPrice', 'duration', 'orderType', 'allOrNone']
@@ -369,45 +390,48 @@ momo_orders = pd.DataFrame(momo_sell_orders + momo_buy_orders, columns=columns)
 #%% Run Growth (ETFs) Strategy
 growth_list = []  # Initialize as an empty list
 
-# Fetch and process data for each symbol in the growth universe
-for symbol in growth_universe:
-    try:
-        data = getData(symbol,growth_minBars)#getData_endDate(symbol, growth_minBars, dataEndDate)  # Fetch growth data
-    except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
-        continue
+# Fetch and process data for each symbol in the growth universe - skipped while the trend filter is off
+if growth_trend_enabled:
+    for symbol in growth_universe:
+        try:
+            data = getData(symbol,growth_minBars)#getData_endDate(symbol, growth_minBars, dataEndDate)  # Fetch growth data
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            continue
 
-    if len(data) < growth_minBars:
-        # Not enough bars
-        print(f"Not enough data for {symbol}")
-        continue
+        if len(data) < growth_minBars:
+            # Not enough bars
+            print(f"Not enough data for {symbol}")
+            continue
 
-    try:
-        date = data.index[-1].strftime("%d/%m/%Y")
-        c = data.Close.iloc[-1]
-        data['growth_factor'] = data['Close'].pct_change(periods=growth_rocP1)*100 + data['Close'].pct_change(periods=growth_rocP2)*100
-        growth_upTrend = False#(data['growth_factor'].iloc[-growth_sinceTrue:] > 0).all()
-
-        growth_buyPrice = c
-        growth_quantity = int(usableCapital * growth_allocaiton / growth_maxPos / growth_buyPrice)
-
-        # print(f"\nSymbol: {symbol}")
-        # print(f"  Date: {date}")
-        # print(f"  Close Price (c): {c}")
-        # print(f"  Growth Factor (latest): {round(data['growth_factor'].iloc[-1], 3)}")
-        # print(f"  Growth UpTrend: {growth_upTrend}")
-        # print(f"  Quantity to Buy: {growth_quantity}")
-        # last_5_growth_factors = data['growth_factor'].iloc[-5:].round(2).tolist()
-        # print(f"  Last 5 Growth Factors: {last_5_growth_factors}")
-
-        # Ensure all values are valid before appending
-        if c > 0 and growth_quantity > 0 and growth_upTrend:
-            growth_list.append([date, symbol, growth_quantity, growth_buyPrice, round(data.growth_factor.iloc[-1], 3)])
-    except Exception as e:
-        print(f"Error processing {symbol}: {e}")
+        try:
+            date = data.index[-1].strftime("%d/%m/%Y")
+            c = data.Close.iloc[-1]
+            close = data.Close.values
+            growth_factors = ind.roc_tail(close, growth_rocP1, growth_sinceTrue) + ind.roc_tail(close, growth_rocP2, growth_sinceTrue)
+            growth_factor = growth_factors[-1]
+            growth_upTrend = (growth_factors > 0).all()
+
+            growth_buyPrice = c
+            growth_quantity = int(usableCapital * growth_allocaiton / growth_maxPos / growth_buyPrice)
+
+            # print(f"\nSymbol: {symbol}")
+            # print(f"  Date: {date}")
+            # print(f"  Close Price (c): {c}")
+            # print(f"  Growth Factor (latest): {round(growth_factor, 3)}")
+            # print(f"  Growth UpTrend: {growth_upTrend}")
+            # print(f"  Quantity to Buy: {growth_quantity}")
+            # last_5_growth_factors = growth_factors[-5:].round(2).tolist()
+            # print(f"  Last 5 Growth Factors: {last_5_growth_factors}")
+
+            # Ensure all values are valid before appending
+            if c > 0 and growth_quantity > 0 and growth_upTrend:
+                growth_list.append([date, symbol, growth_quantity, growth_buyPrice, round(growth_factor, 3)])
+        except Exception as e:
+            print(f"Error processing {symbol}: {e}")
 
 # Sort the processed growth list
-sorted_growth_list = sorted(growth_list, key=lambda x: x[4], reverse=True)[:growth_worstRank]
+sorted_growth_list = heapq.nlargest(growth_worstRank, growth_list, key=lambda x: x[4])
 
 ## Generate Entry and Exit Signals for growth Strategy
 # Create a DataFrame from the sorted growth list
@@ -423,37 +447,22 @@ hold_symbols = growth_df['Symbol'].head(growth_worstRank).tolist()
 # Identify symbols in the top growth_maxPos
 entry_symbols = growth_df['Symbol'].head(growth_maxPos).tolist()
 
-# Determine Sell Orders
-growth_sell_orders = []
-for _, row in growthTrades.iterrows():
-    symbol = row['Symbol']
-    current_quantity = int(row['Quantity'])  # Fetch current holding quantity
-    if symbol not in hold_symbols and current_quantity > 0:  # Sell if the symbol is not in the top acceptable
-        growth_sell_orders.append([
-            symbol,                   # symbol
-            "SELL",                   # tradeAction
-            current_quantity,         # quantity matches current holdings
-            None,                     # limitPrice
-            "OPG",                    # duration
-            "Market",                 # orderType
-            'false'                   # allOrNone
-        ])
-
-# Determine Buy Orders
+# Determine Sell Orders - sell if the symbol is not in the top acceptable
+growth_held_quantity = growthTrades['Quantity'].astype(int)  # current holding quantity
+growth_sell_mask = ~growthTrades['Symbol'].isin(hold_symbols) & (growth_held_quantity > 0)
+growth_sell_orders = [
+    [symbol, "SELL", int(quantity), None, "OPG", "Market", 'false']
+    for symbol, quantity in zip(growthTrades.loc[growth_sell_mask, 'Symbol'], growth_held_quantity[growth_sell_mask])
+]
+
+# Determine Buy Orders - buy only if in top positions and not already held
 growth_buy_orders = []
 if growth_entry_allowed:
-    for _, row in growth_df.iterrows():
-        symbol = row['Symbol']
-        if symbol in entry_symbols and symbol not in current_positions:  # Buy only if in top positions and not already held
-            growth_buy_orders.append([
-                symbol,                   # symbol
-                "BUY",                    # tradeAction
-                int(row['Quantity']),     # quantity
-                None,                     # limitPrice
-                "OPG",                    # duration
-                "Market",                 # orderType
-                'false'                   # allOrNone
-            ])
+    growth_buy_mask = growth_df['Symbol'].isin(entry_symbols) & ~growth_df['Symbol'].isin(current_positions)
+    growth_buy_orders = [
+        [symbol, "BUY", int(quantity), None, "OPG", "Market", 'false']
+        for symbol, quantity in zip(growth_df.loc[growth_buy_mask, 'Symbol'], growth_df.loc[growth_buy_mask, 'Quantity'])
+    ]
 
 # Combine sell and buy orders into a single DataFrame
 columns = ['symbol', 'tradeAction', 'quantity', 'limitPrice', 'duration', 'orderType', 'allOrNone']
@@ -462,36 +471,39 @@ growth_orders = pd.DataFrame(growth_sell_orders + growth_buy_orders, columns=col
 #%% Run Def Strategy
 def_list = []  # Initialize as an empty list
 
-# Fetch and process data for each symbol in the growth universe
-for symbol in def_universe:
-    try:
-        data = getData_endDate(symbol, def_minBars, dataEndDate)  # Fetch def data
-    except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
-        continue
+# Fetch and process data for each symbol in the def universe - skipped while the trend filter is off
+if def_trend_enabled:
+    for symbol in def_universe:
+        try:
+            data = getData_endDate(symbol, def_minBars, dataEndDate)  # Fetch def data
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            continue
 
-    if len(data) < def_minBars:
-        # Not enough bars
-        print(f"Not enough data for {symbol}")
-        continue
+        if len(data) < def_minBars:
+            # Not enough bars
+            print(f"Not enough data for {symbol}")
+            continue
 
-    try:
-        date = data.index[-1].strftime("%d/%m/%Y")
-        c = data.Close.iloc[-1]
-        data['def_factor'] = data['Close'].pct_change(periods=def_rocP1)*100 + data['Close'].pct_change(periods=def_rocP2)*100 
-        def_upTrend = False#(data['def_factor'].iloc[-def_sinceTrue:] > 0).all()
+        try:
+            date = data.index[-1].strftime("%d/%m/%Y")
+            c = data.Close.iloc[-1]
+            close = data.Close.values
+            def_factors = ind.roc_tail(close, def_rocP1, def_sinceTrue) + ind.roc_tail(close, def_rocP2, def_sinceTrue)
+            def_factor = def_factors[-1]
+            def_upTrend = (def_factors > 0).all()
 
-        def_buyPrice = c
-        def_quantity = int(usableCapital * def_allocation / def_maxPos / def_buyPrice)
+            def_buyPrice = c
+            def_quantity = int(usableCapital * def_allocation / def_maxPos / def_buyPrice)
 
-        # Ensure all values are valid before appending
-        if c > 0 and def_quantity > 0 and def_upTrend:
-            def_list.append([date, symbol, def_quantity, def_buyPrice, round(data.def_factor.iloc[-1], 3)])
-    except Exception as e:
-        print(f"Error processing {symbol}: {e}")
+            # Ensure all values are valid before appending
+            if c > 0 and def_quantity > 0 and def_upTrend:
+                def_list.append([date, symbol, def_quantity, def_buyPrice, round(def_factor, 3)])
+        except Exception as e:
+            print(f"Error processing {symbol}: {e}")
 
 # Sort the processed def list
-sorted_def_list = sorted(def_list, key=lambda x: x[4], reverse=True)[:def_worstRank]
+sorted_def_list = heapq.nlargest(def_worstRank, def_list, key=lambda x: x[4])
 
 ## Generate Entry and Exit Signals for def Strategy
 # Create a DataFrame from the sorted def list
@@ -508,37 +520,22 @@ hold_def_symbols = def_df['Symbol'].head(def_worstRank).tolist()
 # Identify symbols in the top def_maxPos
 entry_def_symbols = def_df['Symbol'].head(def_maxPos).tolist()
 
-# Determine Sell Orders
-def_sell_orders = []
-for _, row in defTrades.iterrows():
-    symbol = row['Symbol']
-    current_quantity = int(row['Quantity'])  # Fetch current holding quantity
-    if symbol not in hold_def_symbols and current_quantity > 0:  # Sell if the symbol is not in the top acceptable
-        def_sell_orders.append([
-            symbol,                   # symbol
-            "SELL",                   # tradeAction
-            current_quantity,         # quantity matches current holdings
-            None,                     # limitPrice
-            "OPG",                    # duration
-            "Market",                 # orderType
-            'false'                   # allOrNone
-        ])
-
-# Determine Buy Orders
+# Determine Sell Orders - sell if the symbol is not in the top acceptable
+def_held_quantity = defTrades['Quantity'].astype(int)  # current holding quantity
+def_sell_mask = ~defTrades['Symbol'].isin(hold_def_symbols) & (def_held_quantity > 0)
+def_sell_orders = [
+    [symbol, "SELL", int(quantity), None, "OPG", "Market", 'false']
+    for symbol, quantity in zip(defTrades.loc[def_sell_mask, 'Symbol'], def_held_quantity[def_sell_mask])
+]
+
+# Determine Buy Orders - buy only if in top positions and not already held
 def_buy_orders = []
 if def_entry_allowed:
-    for _, row in def_df.iterrows():
-        symbol = row['Symbol']
-        if symbol in entry_def_symbols and symbol not in current_positions:  # Buy only if in top positions and not already held
-            def_buy_orders.append([
-                symbol,                   # symbol
-                "BUY",                    # tradeAction
-                int(row['Quantity']),     # quantity
-                None,                     # limitPrice
-                "OPG",                    # duration
-                "Market",                 # orderType
-                'false'                   # allOrNone
-            ])
+    def_buy_mask = def_df['Symbol'].isin(entry_def_symbols) & ~def_df['Symbol'].isin(current_positions)
+    def_buy_orders = [
+        [symbol, "BUY", int(quantity), None, "OPG", "Market", 'false']
+        for symbol, quantity in zip(def_df.loc[def_buy_mask, 'Symbol'], def_df.loc[def_buy_mask, 'Quantity'])
+    ]
 
 # Combine sell and buy orders into a single DataFrame
 columns = ['symbol', 'tradeAction', 'quantity', 'limitPrice', 'duration', 'orderType', 'allOrNone']
@@ -546,27 +543,31 @@ def_orders = pd.DataFrame(def_sell_orders + def_buy_orders, columns=columns)
 
 #%% Run BTC Strategy
 btc_list = []
-# Fetch BTC data
-try:
-    btc_data = getData_endDate(btc_universe[0], btc_min_bars, dt.date.today())  # Fetch enough data to evaluate conditions
-except Exception as e:
-    print(f"Error fetching BTC data: {e}")
-    btc_data = pd.DataFrame()  # Default to an empty DataFrame if data cannot be fetched
-
-if not data.empty:
-    # Calculate the 100-day ROC
-    btc_data['btc_factor'] = btc_data['Close'].pct_change(periods=btc_rocPeriod) * 100  # ROC as a percentage
+btc_upTrend = False  # Trend filter off: stay flat
+btc_dataOK = True
+if btc_trend_enabled:
+    # Fetch BTC data
+    try:
+        btc_data = getData_endDate(btc_universe[0], btc_min_bars, TODAY)  # Fetch enough data to evaluate conditions
+    except Exception as e:
+        print(f"Error fetching BTC data: {e}")
+        btc_data = pd.DataFrame()  # Default to an empty DataFrame if data cannot be fetched
 
-    # Check if ROC(C,100) > 0 for all of the last x days
-    btc_upTrend = False#(btc_data['btc_factor'].iloc[-btc_sinceTrue:] > 0).all()
+    btc_dataOK = not btc_data.empty
+    if btc_dataOK:
+        # Calculate the 100-day ROC
+        btc_factors = ind.roc_tail(btc_data['Close'].values, btc_rocPeriod, btc_sinceTrue)  # ROC as a percentage
 
-    # Determine the number of shares for BUY orders
-    btc_quantity = int(usableCapital * btc_allocation / btc_data['Close'].iloc[-1])
+        # Check if ROC(C,100) > 0 for all of the last x days
+        btc_upTrend = (btc_factors > 0).all()
 
+if btc_dataOK:
     # Determine if we should currently be in a position
     btc_trade_action = None
     if btc_upTrend:  # Uptrend: Should be in a position
         if btcTrades.empty and btc_entry_allowed:  # Not currently in a position
+            # Determine the number of shares for BUY orders
+            btc_quantity = int(usableCapital * btc_allocation / btc_data['Close'].iloc[-1])
             btc_trade_action = "BUY"
             btc_list.append([
                 btc_universe[0],   # symbol
@@ -602,21 +603,80 @@ ROT_dataFrame = pd.concat(
     [momo_orders, growth_orders, def_orders, btc_orders], ignore_index=True
 )
 
+# MOMO long positions and rotation BUY orders, which conflict with the MR and HFT short entries
+rot_buy_syms = frozenset(ROT_dataFrame.loc[ROT_dataFrame["tradeAction"] == "BUY", "symbol"])
+momo_long_syms = momo_positions | rot_buy_syms
+
 if len(ROT_dataFrame) > 0:
-    todaysDate = str(dt.date.today().strftime("%d-%m-%Y"))
     ROT_dataFrame.to_csv(
-        "history/" + rot_strategy_name + " - " + todaysDate + ".csv", index=False
+        "history/" + rot_strategy_name + " - " + TODAY_DASH + ".csv", index=False
     )
 
 # %% Run MR Strategy
+# Fetch the MR and HFT universes once, at the longer lookback, so symbols in both are read from Norgate a single
+# time; each scan then takes its own tail, which matches fetching that many bars directly
+mr_tickerList = get_watchlist_symbols(mr_universe)
+hft_tickerList = get_watchlist_symbols(hft_universe)
+scan_bars = max(mr_minBars, hft_minBars) + 1
+
+
+def _fetch_scan(symbol):
+    """Fetch scan bars for a symbol as numpy arrays, returning None if unavailable."""
+    try:
+        return getBarData(symbol, scan_bars)
+    except Exception as e:
+        log(f"----------->> Could not fetch {symbol}: {e}")
+        return None
+
+
+def _mr_bars(symbol, bars):
+    """MR scan window of the shared fetch, or None if the symbol is too short or has gaps."""
+    bars = tail_bars(bars, mr_minBars + 1)
+    # are there enough bars
+    if len(bars.close) < mr_minBars:
+        log("MR_SP500 ----------->>    not enough bars for " + symbol)
+        return None
+    # Gaps would propagate NaN through the recursive indicators
+    if not bars_complete(bars):
+        log("MR_SP500 ----------->>    missing values for " + symbol)
+        return None
+    log("MR_SP500 - Scanning   " + symbol + "   " + str(bars.last_date))
+    return bars
+
+
+# check if symbol is allowed
+mr_scanList = [symbol for symbol in mr_tickerList if symbol != "GOOG"] if (
+    mr_long_entry_allowed or mr_short_entry_allowed) else []
+hft_scanList = [symbol for symbol in hft_tickerList if symbol != "GOOG"]
+scan_symbols = list(dict.fromkeys(mr_scanList + hft_scanList))
+with ThreadPoolExecutor(max_workers=scan_workers) as executor:
+    scan_fetched = {
+        symbol: bars
+        for symbol, bars in zip(scan_symbols, executor.map(_fetch_scan, scan_symbols))
+        if bars is not None
+    }
+
+mr_fetched = {}
+for symbol in mr_scanList:
+    if symbol in scan_fetched:
+        bars = _mr_bars(symbol, scan_fetched[symbol])
+        if bars is not None:
+            mr_fetched[symbol] = bars
+
+
+def _last_bar(symbol):
+    """Bars for an open position, reusing the MR scan fetch when the symbol was scanned."""
+    bars = mr_fetched.get(symbol)
+    if bars is None:
+        bars = getBarData(symbol, 3)
+    return bars
+
+
 # Generate Exit Signals from open positions
-# Create a DataFrame from the trade records
-df = pd.DataFrame(trade_records)
+# MR positions are filtered by strategy only, so use the unfiltered trades frame
+df = trade_df
 
 if not df.empty:
-    # Convert Quantity to a numeric value from a string so the filtering will work
-    df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
-
     # Filter SHORT positions
     shortPositions = df[
         (df["Trade Action"] == "SELLSHORT")
@@ -635,11 +695,16 @@ if not df.empty:
     longPositions.rename({"Quantity": "Position"}, axis=1, inplace=True)
     shortPositions.rename({"Quantity": "Position"}, axis=1, inplace=True)
 
+    # Last bars for every open position, fetched concurrently where the scan did not cover them
+    with ThreadPoolExecutor(max_workers=scan_workers) as executor:
+        longLastBars = list(executor.map(_last_bar, longPositions.Symbol))
+        shortLastBars = list(executor.map(_last_bar, shortPositions.Symbol))
+
     # Exit Signals Long
     exitOrderListLong = []
     for i in range(len(longPositions)):
         symbol = longPositions.iloc[i].Symbol
-        prevHigh = str(round(getData(symbol, 3).High.iloc[-1], 2))
+        prevHigh = str(round(longLastBars[i].high[-1], 2))
         exitOrderListLong.append(
             [
                 symbol,
@@ -657,7 +722,7 @@ if not df.empty:
     exitOrderListShort = []
     for i in range(len(shortPositions)):
         symbol = shortPositions.iloc[i].Symbol
-        prevLow = str(round(getData(symbol, 3).Low.iloc[-1], 2))
+        prevLow = str(round(shortLastBars[i].low[-1], 2))
         exitOrderListShort.append(
             [
                 symbol,
@@ -678,72 +743,71 @@ else:
     numOpenPosShort = 0
 
 # Generate Entry Signals
-# Scan for Long signals - Long mr positions and Orders will not conflict with MOMO therefore no addtional checks required
-mr_tickerList = norgatedata.watchlist_symbols(mr_universe)
-tradeListLong = []
-if mr_long_entry_allowed:
-    for symbol in mr_tickerList:
-        # check if symbol is allowed
-        if symbol == "GOOG":
-            continue
-        # Check if already in a long_mr_position
-        inPosFlag = False
-        for i in range(len(exitOrderListLong)):
-            if symbol == exitOrderListLong[i][0]:
-                inPosFlag = True
-                break
-        if inPosFlag:
-            continue
-        # attempt to call data from norgate
-        try:
-            data = getData(symbol, mr_minBars + 1)
-        except:
-            continue
-        # are there enough bars
-        if len(data) < mr_minBars:
-            print("MR_SP500 ----------->>    not enough bars for " + symbol)
-            continue
-        print("MR_SP500 - Scanning   " + symbol + "   " + str(data.index[-1]))
+mr_indicatorSpec = {
+    "atr": ("atr", mr_atrPeriod),
+    "ma": ("sma", mr_maPeriod),
+    "adx": ("adx", mr_adxPeriod),
+    "avgVolume": ("volume_sma", mr_volumePeriod),
+    "longRsi": ("rsi", mr_long_rsiPeriod),
+    "shortRsi": ("rsi", mr_short_rsiPeriod),
+}
 
-        try:
-            date = data.index[-1]
-            c = data.Close.iloc[-1]
-            l = data.Low.iloc[-1]
-            h = data.High.iloc[-1]
-
-            mr_atr = (
-                ta.volatility.AverageTrueRange(
-                    data.High, data.Low, data.Close, mr_atrPeriod, True
-                )
-                .average_true_range()
-                .iloc[-1]
-            )
-            mr_ma = (
-                ta.trend.SMAIndicator(data.Close, mr_maPeriod, True)
-                .sma_indicator()
-                .iloc[-1]
-            )
-            mr_adx = (
-                ta.trend.ADXIndicator(
-                    data.High, data.Low, data.Close, mr_adxPeriod, fillna=True
-                )
-                .adx()
-                .iloc[-1]
-            )
-            mr_avgVolume = (
-                ta.trend.SMAIndicator(data.Volume, mr_volumePeriod, True)
-                .sma_indicator()
-                .iloc[-1]
-            )
-            mr_volatility = mr_atr / c * 100
 
-            mr_long_rsi = (
-                ta.momentum.RSIIndicator(data.Close, mr_long_rsiPeriod, True)
-                .rsi()
-                .iloc[-1]
-            )
-            mr_long_entryLimit = round(l - mr_long_stretch * mr_atr, 2)
+def _mr_features(fetched):
+    """Last-bar MR indicators for every fetched symbol, one row per symbol.
+
+    Equal-length histories are stacked into (symbols x bars) panels so each indicator is a
+    single kernel call per panel rather than one call per symbol.
+    """
+    frames = []
+    for symbols, panel in stack_bar_panels(fetched):
+        frames.append(pd.DataFrame({
+            "date": panel.last_date,
+            "c": panel.close[:, -1],
+            "l": panel.low[:, -1],
+            "h": panel.high[:, -1],
+            **ind.last_bar_panel(panel.high, panel.low, panel.close, panel.volume, mr_indicatorSpec),
+        }, index=symbols))
+    features = pd.concat(frames) if frames else pd.DataFrame(
+        columns=["date", "c", "l", "h", "atr", "ma", "adx", "avgVolume", "longRsi", "shortRsi"])
+    # Restore universe order so ties rank exactly as the symbol-by-symbol scan did
+    return features.loc[list(fetched)]
+
+
+tradeListLong = []
+tradeListShort = []
+if mr_long_entry_allowed or mr_short_entry_allowed:
+    # The price floor only needs the last close, so symbols below it skip the indicator pass
+    mr_features = _mr_features({
+        symbol: bars for symbol, bars in mr_fetched.items() if bars.close[-1] > mr_minPrice
+    })
+    mr_features["volatility"] = mr_features["atr"] / mr_features["c"] * 100
+
+    # Setup conditions shared by the long and short sides
+    mr_setup = (
+        (mr_features["c"] > mr_minPrice)
+        & (mr_features["avgVolume"] > mr_volumeLimit)
+        & (mr_features["c"] > mr_features["ma"])
+        & (mr_features["adx"] > mr_adxLimit)
+    )
 
+    # Scan for Long signals - Long mr positions and Orders will not conflict with MOMO therefore no addtional checks required
+    if mr_long_entry_allowed:
+        # Check if already in a long_mr_position
+        long_exit_symbols = {exitOrder[0] for exitOrder in exitOrderListLong}
+        mr_longMask = (
+            mr_setup
+            & (mr_features["longRsi"] < mr_long_rsiLimit)
+            & ~mr_features.index.isin(long_exit_symbols)
+        )
+        mr_longCandidates = mr_features[mr_longMask]
+        # Rank on volatility rounded to 3dp, keeping scan order among ties, and price only the selected entries
+        mr_longTop = ind.top_n_indices(
+            [round(v, 3) for v in mr_longCandidates["volatility"].tolist()],
+            max(0, mr_long_maxPos - numOpenPosLong),
+        )
+        for row in mr_longCandidates.iloc[mr_longTop].itertuples():
+            mr_long_entryLimit = round(row.l - mr_long_stretch * row.atr, 2)
             mr_long_quantity = max(
                 1,
                 int(
@@ -753,109 +817,31 @@ if mr_long_entry_allowed:
                     / mr_long_entryLimit
                 ),
             )
+            tradeListLong.append(
+                [row.Index, "BUY", mr_long_quantity, mr_long_entryLimit, "GTC", "Limit", "false"]
+            )
 
-        except:
-            print("----------->>    unable to process indicators for " + symbol)
-            continue
-
-        # Check for Long Setup
-        if (
-            c > mr_minPrice
-            and mr_avgVolume > mr_volumeLimit
-            and c > mr_ma
-            and mr_adx > mr_adxLimit
-            and mr_long_rsi < mr_long_rsiLimit
-        ):
-            mr_long_rank = round(mr_volatility, 3)
-            entryLong = [
-                symbol,
-                "BUY",
-                mr_long_quantity,
-                mr_long_entryLimit,
-                0,
-                0,
-                mr_long_rank,
-                date,
-            ]
-            tradeListLong.append(entryLong)
-
-# Scan for Short signals - Short mr Orders will conflict with MOMO long positions or orders - a check is required here
-tradeListShort = []
-if mr_short_entry_allowed:
-    for symbol in mr_tickerList:
-        # Check if the symbol is not allowed (e.g., special exclusions)
-        if symbol == "GOOG":
-            continue
-
+    # Scan for Short signals - Short mr Orders will conflict with MOMO long positions or orders - a check is required here
+    if mr_short_entry_allowed:
         # Skip if the symbol is already in an open mr_short_position
-        inPosFlag = False
-        for i in range(len(exitOrderListShort)):
-            if symbol == exitOrderListShort[i][0]:
-                inPosFlag = True
-                break
-        if inPosFlag:
-            continue
-
+        short_exit_symbols = {exitOrder[0] for exitOrder in exitOrderListShort}
+        mr_shortMask = (
+            mr_setup
+            & (mr_features["shortRsi"] > mr_short_rsiLimit)
+            & ~mr_features.index.isin(short_exit_symbols)
+        )
+        mr_shortCandidates = mr_features[mr_shortMask]
         # Skip if the symbol is in MOMO positions or has a BUY order in MOMO orders
-        if symbol in momo_positions or any(
-            momo_order[0] == symbol and momo_order[1] == "BUY"
-            for momo_order in ROT_dataFrame.values.tolist()
-        ):
+        mr_shortConflicts = mr_shortCandidates.index.isin(momo_long_syms)
+        for symbol in mr_shortCandidates.index[mr_shortConflicts]:
             print(f"{symbol} --- MOMO conflict (LONG POSITION or ORDER)")
-            continue
-
-        # Fetch data and process indicators
-        try:
-            data = getData(symbol, mr_minBars + 1)
-        except:
-            continue
-
-        # Ensure there are enough bars
-        if len(data) < mr_minBars:
-            print(f"----------->>    not enough bars for {symbol}")
-            continue
-
-        print(f"MR_SP500 - scanning   {symbol}   {str(data.index[-1])}")
-
-        try:
-            date = data.index[-1]
-            c = data.Close.iloc[-1]
-            l = data.Low.iloc[-1]
-            h = data.High.iloc[-1]
-
-            mr_atr = (
-                ta.volatility.AverageTrueRange(
-                    data.High, data.Low, data.Close, mr_atrPeriod, True
-                )
-                .average_true_range()
-                .iloc[-1]
-            )
-            mr_ma = (
-                ta.trend.SMAIndicator(data.Close, mr_maPeriod, True)
-                .sma_indicator()
-                .iloc[-1]
-            )
-            mr_adx = (
-                ta.trend.ADXIndicator(
-                    data.High, data.Low, data.Close, mr_adxPeriod, fillna=True
-                )
-                .adx()
-                .iloc[-1]
-            )
-            mr_avgVolume = (
-                ta.trend.SMAIndicator(data.Volume, mr_volumePeriod, True)
-                .sma_indicator()
-                .iloc[-1]
-            )
-            mr_volatility = mr_atr / c * 100
-
-            mr_short_rsi = (
-                ta.momentum.RSIIndicator(data.Close, mr_short_rsiPeriod, True)
-                .rsi()
-                .iloc[-1]
-            )
-            mr_short_entryLimit = round(h + mr_short_stretch * mr_atr, 2)
-
+        mr_shortCandidates = mr_shortCandidates[~mr_shortConflicts]
+        mr_shortTop = ind.top_n_indices(
+            [round(v, 3) for v in mr_shortCandidates["volatility"].tolist()],
+            max(0, mr_short_maxPos - numOpenPosShort),
+        )
+        for row in mr_shortCandidates.iloc[mr_shortTop].itertuples():
+            mr_short_entryLimit = round(row.h + mr_short_stretch * row.atr, 2)
             mr_short_quantity = max(
                 1,
                 int(
@@ -865,358 +851,284 @@ if mr_short_entry_allowed:
                     / mr_short_entryLimit
                 ),
             )
-        except:
-            print(f"----------->>    unable to process indicators for {symbol}")
-            continue
-
-        # Check for Short Setup
-        if (
-            c > mr_minPrice
-            and mr_avgVolume > mr_volumeLimit
-            and c > mr_ma
-            and mr_adx > mr_adxLimit
-            and mr_short_rsi > mr_short_rsiLimit
-        ):
-            mr_short_rank = round(mr_volatility, 3)
-            entryShort = [
-                symbol,
-                "SELLSHORT",
-                mr_short_quantity,
-                mr_short_entryLimit,
-                0,
-                0,
-                mr_short_rank,
-                date,
-            ]
-            tradeListShort.append(entryShort)
-
-# Sort Long Orders
-sortedListLong = sorted(tradeListLong, key=lambda x: (x[6]), reverse=True)[
-    0 : max(0, mr_long_maxPos - numOpenPosLong)
-]
-tradeListLong = []
-for i in range(len(sortedListLong)):
-    tradeListLong.append(sortedListLong[i][:4] + ["GTC", "Limit", "false"])
+            tradeListShort.append(
+                [row.Index, "SELLSHORT", mr_short_quantity, mr_short_entryLimit, "GTC", "Limit", "false"]
+            )
 
-# Sort Short Orders
-sortedListShort = sorted(tradeListShort, key=lambda x: (x[6]), reverse=True)[
-    0 : max(0, mr_short_maxPos - numOpenPosShort)
-]
-tradeListShort = []
-for i in range(len(sortedListShort)):
-    tradeListShort.append(sortedListShort[i][:4] + ["GTC", "Limit", "false"])
-
-# Combine long and short orders into dataframe
-mr_ordersList = exitOrderListLong + tradeListLong + exitOrderListShort + tradeListShort
-mr_dataFrame = pd.DataFrame(mr_ordersList, columns=columns)
-if len(mr_ordersList) > 0:
-    todaysDate = str(dt.date.today().strftime("%d-%m-%Y"))
-    mr_dataFrame.to_csv(
-        "history/" + mr_strategy_name + " - " + todaysDate + ".csv", index=False
+# Combine long and short orders; the records go straight to Mongo and a frame is only built for the CSV
+mr_ordersList = list(chain(exitOrderListLong, tradeListLong, exitOrderListShort, tradeListShort))
+mr_signals = [dict(zip(columns, order)) for order in mr_ordersList]
+if mr_ordersList:
+    pd.DataFrame.from_records(mr_ordersList, columns=columns).to_csv(
+        "history/" + mr_strategy_name + " - " + TODAY_DASH + ".csv", index=False
     )
 
 # %% Run HFT System
-hft_tickerList = norgatedata.watchlist_symbols(hft_universe)
-hft_tradeListLong = []
-hft_tradeListShort = []
+def _hft_bars(symbol, bars):
+    """HFT scan window of the shared fetch, or None if the symbol is too short or has gaps."""
+    bars = tail_bars(bars, hft_minBars + 1)
+    if len(bars.close) < hft_minBars:
+        log(f"----------->> Not enough bars for {symbol}")
+        return None
+    if not bars_complete(bars):
+        log(f"----------->> Missing values for {symbol}")
+        return None
+    log(f"HFT_R1000 - Scanning {symbol} {bars.last_date}")
+    return bars
+
+
+hft_indicatorSpec = {
+    "avgVolume": ("volume_ema", hft_volumePeriod),
+    "ma": ("sma", hft_maPeriod),
+    "adx": ("adx", hft_adxPeriod),
+    "atr": ("atr", hft_atrPeriod),
+}
 
-for symbol in hft_tickerList:
-    if symbol == "GOOG":
-        continue
 
-    try:
-        data = getData(symbol, hft_minBars + 1)
-    except:
-        continue
+def _hft_features(fetched):
+    """Last-bar HFT indicators for every fetched symbol, one row per symbol, computed panel-wise."""
+    frames = []
+    for symbols, panel in stack_bar_panels(fetched):
+        high, low, close = panel.high[:, -1], panel.low[:, -1], panel.close[:, -1]
+        # A zero-range bar gives a NaN/inf IBR, which fails every setup comparison as before
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ibr = ind.IBR(high, low, close)
+        frames.append(pd.DataFrame({
+            "close": close,
+            "low": low,
+            "high": high,
+            **ind.last_bar_panel(panel.high, panel.low, panel.close, panel.volume, hft_indicatorSpec),
+            "ibr": ibr,
+        }, index=symbols))
+    features = pd.concat(frames) if frames else pd.DataFrame(
+        columns=["close", "low", "high", "avgVolume", "ma", "adx", "atr", "ibr"])
+    # Restore universe order so ties rank exactly as the symbol-by-symbol scan did
+    return features.loc[list(fetched)]
+
+
+hft_fetched = {}
+for symbol in hft_scanList:
+    if symbol in scan_fetched:
+        bars = _hft_bars(symbol, scan_fetched[symbol])
+        if bars is not None:
+            hft_fetched[symbol] = bars
+
+
+def _hft_in_band(bars):
+    """Cheap last-bar check: can this symbol pass either side's price band and IBR limit?"""
+    close = bars.close[-1]
+    bar_range = bars.high[-1] - bars.low[-1]
+    if bar_range == 0:
+        # Zero-range bars have no IBR and fail both sides
+        return False
+    ibr = (close - bars.low[-1]) / bar_range
+    return (
+        (hft_long_minPrice < close < hft_long_maxPrice and ibr < hft_long_ibrLimit)
+        or (hft_short_minPrice < close < hft_short_maxPrice and ibr > hft_short_ibrLimit)
+    )
 
-    if len(data) < hft_minBars:
-        print(f"----------->> Not enough bars for {symbol}")
-        continue
 
-    print(f"HFT_R1000 - Scanning {symbol} {data.index[-1]}")
+# Only symbols that survive the last-bar checks need the indicator pass
+hft_features = _hft_features({symbol: bars for symbol, bars in hft_fetched.items() if _hft_in_band(bars)})
+hft_features["volatility"] = hft_features["atr"] / hft_features["close"] * 100
 
-    try:
-        close = data.Close.iloc[-1]
-        low = data.Low.iloc[-1]
-        high = data.High.iloc[-1]
-
-        hft_avgVolume = (
-            ta.trend.EMAIndicator(data.Volume, hft_volumePeriod, True)
-            .ema_indicator()
-            .iloc[-1]
-        )
-        hft_ma = (
-            ta.trend.SMAIndicator(data.Close, hft_maPeriod, True)
-            .sma_indicator()
-            .iloc[-1]
-        )
-        hft_adx = (
-            ta.trend.ADXIndicator(
-                data.High, data.Low, data.Close, hft_adxPeriod, fillna=True
-            )
-            .adx()
-            .iloc[-1]
-        )
-        hft_atr = (
-            ta.volatility.AverageTrueRange(
-                data.High, data.Low, data.Close, hft_atrPeriod, True
-            )
-            .average_true_range()
-            .iloc[-1]
-        )
-        hft_ibr = ind.IBR(data.High.iloc[-1], data.Low.iloc[-1], data.Close.iloc[-1])
-        hft_volatility = hft_atr / close * 100
-    except:
-        print(f"----------->>HFT - Unable to process indicators for {symbol}")
-        continue
+# Setup conditions shared by the long and short sides
+hft_setup = (
+    (hft_features["avgVolume"] > hft_volumeLimit)
+    & (hft_features["close"] > hft_features["ma"])
+    & (hft_features["adx"] > hft_adxLimit)
+)
 
-    rank = hft_volatility
-    # Scanning for Long Setups
-    if (
-        close > hft_long_minPrice
-        and close < hft_long_maxPrice
-        and hft_avgVolume > hft_volumeLimit
-        and close > hft_ma
-        and hft_adx > hft_adxLimit
-        and hft_ibr < hft_long_ibrLimit
-    ):
-        hft_tradeListLong.append([rank, symbol, hft_atr, low])
-
-    # Scanning for Short Setups
-    if (
-        close > hft_short_minPrice
-        and close < hft_short_maxPrice
-        and hft_avgVolume > hft_volumeLimit
-        and close > hft_ma
-        and hft_adx > hft_adxLimit
-        and hft_ibr > hft_short_ibrLimit
-    ):
-        hft_tradeListShort.append([rank, symbol, hft_atr, high])
-
-hft_sortedListLong = sorted(hft_tradeListLong, key=lambda x: x[0], reverse=True)
-hft_sortedListShort = sorted(hft_tradeListShort, key=lambda x: x[0], reverse=True)
+# Scanning for Long Setups
+hft_longMask = (
+    hft_setup
+    & (hft_features["close"] > hft_long_minPrice)
+    & (hft_features["close"] < hft_long_maxPrice)
+    & (hft_features["ibr"] < hft_long_ibrLimit)
+)
+hft_tradeListLong = [
+    [row.volatility, row.Index, row.atr, row.low]
+    for row in hft_features[hft_longMask].itertuples()
+]
+
+# Scanning for Short Setups
+hft_shortMask = (
+    hft_setup
+    & (hft_features["close"] > hft_short_minPrice)
+    & (hft_features["close"] < hft_short_maxPrice)
+    & (hft_features["ibr"] > hft_short_ibrLimit)
+)
+hft_tradeListShort = [
+    [row.volatility, row.Index, row.atr, row.high]
+    for row in hft_features[hft_shortMask].itertuples()
+]
+
+# Symbols with MR/MOMO positions or orders, indexed once for the conflict checks below
+mr_short_syms = frozenset(order[0] for order in mr_ordersList if order[1] in ("BUYTOCOVER", "SELLSHORT"))
+mr_long_syms = frozenset(order[0] for order in mr_ordersList if order[1] in ("SELL", "BUY"))
 
 # Generate the hft_long Tradelist and check against mr positions and orders
 hft_orderListLong = []
 if hft_long_entry_allowed:
-    placedOrderCount = 0
-    for trade in hft_sortedListLong:
-        rank, symbol, atr, low = trade
-
-        # Skip if there's a conflict with mr short positions or orders
-        skipFlag = False
-        for order in mr_ordersList:
-            if symbol == order[0] and (
-                order[1] == "BUYTOCOVER" or order[1] == "SELLSHORT"
-            ):
-                print(f"{symbol} -------- MR-SHORT POS or ORDER conflict")
-                skipFlag = True
-                break
-        if skipFlag:
-            continue
+    # Skip candidates that conflict with mr short positions or orders, then keep the top ranked
+    hft_candidatesLong = []
+    for trade in hft_tradeListLong:
+        if trade[1] in mr_short_syms:
+            print(f"{trade[1]} -------- MR-SHORT POS or ORDER conflict")
+        else:
+            hft_candidatesLong.append(trade)
+    hft_sortedListLong = [
+        hft_candidatesLong[i]
+        for i in ind.top_n_indices([trade[0] for trade in hft_candidatesLong], hft_long_maxPos)
+    ]
 
-        tick = ind.tickSize(low)
-        hft_long_entryLimit = round(
-            round((low - hft_long_stretch * atr) / tick, 0) * tick, 3
-        )
-        hft_long_quantity = max(
-            1,
-            int(
-                (
-                    usableCapital
-                    * hft_allocationLong
-                    / hft_long_maxPos
-                    / hft_long_entryLimit
-                )
-                - 1
-            ),
-        )
-        if placedOrderCount == hft_long_maxPos:
-            break
+    # Tick-rounded entry limits and quantities for every selected candidate in one compiled pass
+    hft_longLimits, hft_longQuantities = ind.stretched_entries(
+        [trade[3] for trade in hft_sortedListLong],
+        [trade[2] for trade in hft_sortedListLong],
+        -hft_long_stretch,
+        usableCapital * hft_allocationLong / hft_long_maxPos,
+    )
+    for i, trade in enumerate(hft_sortedListLong):
         hft_orderListLong.append(
             [
-                symbol,
+                trade[1],
                 "BUY",
-                hft_long_quantity,
-                hft_long_entryLimit,
+                int(hft_longQuantities[i]),
+                float(hft_longLimits[i]),
                 "GTC",
                 "Limit",
                 "false",
             ]
         )
-        placedOrderCount += 1
 
 # Generate the hft_Short Tradelist and check against MR and MOMO conflicts
 hft_orderListShort = []
 if hft_short_entry_allowed:
-    placedOrderCount = 0
-    for trade in hft_sortedListShort:
-        rank, symbol, atr, high = trade
-
-        # Skip if there's a conflict with MR long positions or orders
-        skipFlag = False
-        for order in mr_ordersList:
-            if symbol == order[0] and (order[1] == "SELL" or order[1] == "BUY"):
-                print(f"{symbol} -------- MR-LONG POS or ORDER conflict")
-                skipFlag = True
-                break
-        # Skip if there's a conflict with MOMO long positions or orders
-        if symbol in momo_positions or any(
-            order[0] == symbol and order[1] == "BUY"
-            for order in ROT_dataFrame.values.tolist()
-        ):
-            print(f"{symbol} -------- MOMO LONG POS or ORDER conflict")
-            skipFlag = True
-
-        if skipFlag:
+    # Skip candidates that conflict with MR or MOMO long positions or orders, then keep the top ranked
+    hft_short_blocked = mr_long_syms | momo_long_syms
+    hft_candidatesShort = []
+    for trade in hft_tradeListShort:
+        symbol = trade[1]
+        if symbol not in hft_short_blocked:
+            hft_candidatesShort.append(trade)
             continue
+        if symbol in mr_long_syms:
+            print(f"{symbol} -------- MR-LONG POS or ORDER conflict")
+        if symbol in momo_long_syms:
+            print(f"{symbol} -------- MOMO LONG POS or ORDER conflict")
+    hft_sortedListShort = [
+        hft_candidatesShort[i]
+        for i in ind.top_n_indices([trade[0] for trade in hft_candidatesShort], hft_short_maxPos)
+    ]
 
-        tick = ind.tickSize(high)
-        hft_short_entryLimit = round(
-            round((high + hft_short_stretch * atr) / tick, 0) * tick, 3
-        )
-        hft_short_quantity = max(
-            1,
-            int(
-                (
-                    usableCapital
-                    * hft_allocationShort
-                    / hft_short_maxPos
-                    / hft_short_entryLimit
-                )
-                - 1
-            ),
-        )
-        if placedOrderCount == hft_short_maxPos:
-            break
+    # Tick-rounded entry limits and quantities for every selected candidate in one compiled pass
+    hft_shortLimits, hft_shortQuantities = ind.stretched_entries(
+        [trade[3] for trade in hft_sortedListShort],
+        [trade[2] for trade in hft_sortedListShort],
+        hft_short_stretch,
+        usableCapital * hft_allocationShort / hft_short_maxPos,
+    )
+    for i, trade in enumerate(hft_sortedListShort):
         hft_orderListShort.append(
             [
-                symbol,
+                trade[1],
                 "SELLSHORT",
-                hft_short_quantity,
-                hft_short_entryLimit,
+                int(hft_shortQuantities[i]),
+                float(hft_shortLimits[i]),
                 "GTC",
                 "Limit",
                 "false",
             ]
         )
-        placedOrderCount += 1
 
-# Combine long and short hft orders into dataframe
-hft_ordersList = hft_orderListLong + hft_orderListShort
-hft_dataFrame = pd.DataFrame(hft_ordersList, columns=columns)
+# Combine long and short hft orders; as for MR, a frame is only built for the CSV
+hft_ordersList = list(chain(hft_orderListLong, hft_orderListShort))
+hft_signals = [dict(zip(columns, order)) for order in hft_ordersList]
 if hft_ordersList:
-    todaysDate = str(dt.date.today().strftime("%d-%m-%Y"))
-    hft_dataFrame.to_csv(f"history/{hft_strategy_name} - {todaysDate}.csv", index=False)
+    pd.DataFrame.from_records(hft_ordersList, columns=columns).to_csv(
+        f"history/{hft_strategy_name} - {TODAY_DASH}.csv", index=False
+    )
 
 # %% Send Signals to Mongo Database
 # Fetch the last 2 days of data for SPY from Norgate Data
 spy_data = getData("SPY", 2)
 spyDt = spy_data.index[-1].date()
+spyDt_name = spyDt.strftime("%A")
 
-# Initialize MongoDB success flag
-mongoOK = False
-
-# MOMO signals
-momo_sent = send_signals_to_mongo(
-    strategy_name=rot_strategy_name,
-    strategy_type=rot_strategy_type,
-    signals_df=ROT_dataFrame,
-    strategy_id=os.environ.get(rot_strategy_name),
-    is_live=isLive,
-    api_key=ACCOUNT_API_KEY,
-    spy_date=spyDt,
-    spy_date_name=spyDt.strftime("%A"),
-)
-mongoOK = mongoOK or momo_sent
-
-# Send MR signals
-mr_sent = send_signals_to_mongo(
-    strategy_name=mr_strategy_name,
-    strategy_type=mr_strategy_type,
-    signals_df=mr_dataFrame,
-    strategy_id=os.environ.get(mr_strategy_name),
-    is_live=isLive,
-    api_key=ACCOUNT_API_KEY,
-    spy_date=spyDt,
-    spy_date_name=spyDt.strftime("%A"),
-)
-mongoOK = mongoOK or mr_sent
-
-# Send hft signals
-hft_sent = send_signals_to_mongo(
-    strategy_name=hft_strategy_name,
-    strategy_type=hft_strategy_type,
-    signals_df=hft_dataFrame,
-    strategy_id=os.environ.get(hft_strategy_name),
-    is_live=isLive,
-    api_key=ACCOUNT_API_KEY,
-    spy_date=spyDt,
-    spy_date_name=spyDt.strftime("%A"),
-)
-mongoOK = mongoOK or hft_sent
+# One payload per strategy; the sends are independent network calls, so issue them concurrently
+mongo_payloads = {
+    rot_strategy_name: (rot_strategy_type, ROT_dataFrame, rot_strategy_id),
+    mr_strategy_name: (mr_strategy_type, mr_signals, mr_strategy_id),
+    hft_strategy_name: (hft_strategy_type, hft_signals, hft_strategy_id),
+}
+with ThreadPoolExecutor(max_workers=len(mongo_payloads)) as executor:
+    mongo_futures = {
+        name: executor.submit(
+            send_signals_to_mongo,
+            strategy_name=name,
+            strategy_type=strategy_type,
+            signals_df=signals,
+            strategy_id=strategy_id,
+            is_live=isLive,
+            api_key=ACCOUNT_API_KEY,
+            spy_date=spyDt,
+            spy_date_name=spyDt_name,
+        )
+        for name, (strategy_type, signals, strategy_id) in mongo_payloads.items()
+    }
+    mongo_sent = {name: future.result() for name, future in mongo_futures.items()}
 
-mongoOK = True
+# MongoDB is OK only if every strategy's signals were accepted
+mongoOK = all(mongo_sent.values())
 
 # %% Build Table for Open Positions in Email
-# Convert to DataFrame
-df = pd.DataFrame(trade_records)
-
 # Filter only this user's positions and known strategy names
 my_strategies = [mr_strategy_name, rot_strategy_name, hft_strategy_name]
-df = df[(df["User"] == utm_userName) & (df["Strategy"].isin(my_strategies))].copy()
-
-# Ensure correct types and format
-df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
-df["OpenedDateTime"] = pd.to_datetime(df["Opened DateTime"], errors="coerce")
-
-# Build the table of open positions
-open_positions_table_data = []
-
-for _, row in df.iterrows():
-    symbol = row["Symbol"]
-    strategy = row["Strategy"]
-    action = row["Trade Action"]
-    qty = row["Quantity"]
-    entry_price = row["Execution Price"]
-    entry_date = (
-        row["OpenedDateTime"].date().strftime("%Y-%m-%d")
-        if pd.notnull(row["OpenedDateTime"])
-        else "Unknown"
-    )
+df = trade_df[(trade_df["User"] == utm_userName) & (trade_df["Strategy"].isin(my_strategies))]
 
-    if not entry_price or qty == 0:
-        continue
+# Last closes for the open positions: reuse the MR/HFT scan data, then fetch the rest in one concurrent batch
+last_closes = {
+    symbol: bars.close[-1]
+    for fetched in (mr_fetched, hft_fetched)
+    for symbol, bars in fetched.items()
+}
+missing_symbols = [symbol for symbol in df["Symbol"].unique() if symbol not in last_closes]
+last_closes.update(
+    (symbol, data.Close.iloc[-1])
+    for symbol, data in getData_many(missing_symbols, 2, max_workers=scan_workers).items()
+    if len(data)
+)
 
-    try:
-        data = getData(symbol, 2)
-        last_close = float(data.Close.iloc[-1])
-    except:
-        last_close = entry_price  # fallback if price data fails
-
-    if action == "BUY":
-        open_pnl = (last_close - entry_price) * qty
-        pnl_pct = ((last_close - entry_price) / entry_price) * 100
-    elif action == "SELLSHORT":
-        open_pnl = (entry_price - last_close) * qty
-        pnl_pct = ((entry_price - last_close) / entry_price) * 100
-    else:
-        open_pnl = 0
-        pnl_pct = 0
-
-    open_positions_table_data.append(
-        [
-            symbol,
-            strategy,
-            action,
-            int(qty),
-            entry_price,
-            last_close,
-            open_pnl,
-            pnl_pct,
-            entry_date,
-        ]
+# Build the table of open positions - skip unfilled rows, then compute PnL column-wise
+df = df[(df["Execution Price"] != 0) & (df["Quantity"] != 0)]
+entry_price = df["Execution Price"]
+last_close = df["Symbol"].map(last_closes).astype(float).where(
+    df["Symbol"].isin(last_closes.keys()), entry_price  # fallback if price data fails
+)
+# +1 for BUY, -1 for SELLSHORT (profits when price falls), 0 for anything else
+pnl_sign = np.where(
+    df["Trade Action"] == "BUY", 1.0, np.where(df["Trade Action"] == "SELLSHORT", -1.0, 0.0)
+)
+price_move = pnl_sign * (last_close - entry_price)
+open_pnl = np.where(pnl_sign != 0, price_move * df["Quantity"], 0.0)
+pnl_pct = np.where(pnl_sign != 0, price_move / entry_price * 100, 0.0)
+entry_date = df["OpenedDateTime"].dt.strftime("%Y-%m-%d").fillna("Unknown")
+
+open_positions_table_data = [
+    list(row)
+    for row in zip(
+        df["Symbol"].tolist(),
+        df["Strategy"].tolist(),
+        df["Trade Action"].tolist(),
+        df["Quantity"].astype(int).tolist(),
+        entry_price.tolist(),
+        last_close.tolist(),
+        open_pnl.tolist(),
+        pnl_pct.tolist(),
+        entry_date.tolist(),
     )
+]
 
 strategy_name_map = {
     mr_strategy_name: mr_strategy_type,
@@ -1226,7 +1138,7 @@ strategy_name_map = {
 
 # %% Send Email
 # Set recipient list and email subject
-email_subject = f"{strategy_package_name} - {dt.date.today().strftime('%d/%m/%Y')}"
+email_subject = f"{strategy_package_name} - {TODAY_SLASH}"
 
 # Generate Email Content
 header_html = generate_email_header("Strategy: " + strategy_package_name)
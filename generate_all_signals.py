@@ -18,15 +18,22 @@ Author: Claude Code
 Date: 2025-11-12
 """
 
+import csv
+import io
+import multiprocessing
 import os
 import sys
-from datetime import datetime, timedelta
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from functools import lru_cache, partial
+from itertools import repeat
+from typing import NamedTuple
 import pandas as pd
 import numpy as np
-import norgatedata as nd
-from ta.trend import ADXIndicator, SMAIndicator
-from ta.volatility import AverageTrueRange
-from ta.momentum import RSIIndicator
 import pytz
 from dotenv import load_dotenv
 
@@ -58,6 +65,16 @@ BUFFER = 0.20  # 20% safety buffer on leverage
 OUTPUT_DIR = "output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Exchange timezone, and the 15:44 ET Good Till Date used by the HFT entries
+ET_TZ = pytz.timezone('US/Eastern')
+GTD_CUTOFF_ET = time(15, 44)
+
+# Worker threads for the universe scans and the prefetch
+SCAN_WORKERS = 16
+
+# Worker processes for the indicator kernels when numba is unavailable (the pure-Python kernels hold the GIL)
+INDICATOR_PROCESSES = os.cpu_count() or 1
+
 # ============================================================================
 # STRATEGY PARAMETERS
 # ============================================================================
@@ -87,8 +104,8 @@ GROWTH_UP_TREND = True  # Enable uptrend filter
 GROWTH_MA_PERIOD = 100
 GROWTH_SINCE_TRUE = 5  # Must be true for 5 bars
 GROWTH_MIN_BARS = 250
-GROWTH_SYMBOLS = ["QQQ", "SPY", "IOO"]
-GROWTH_UNIVERSE = ["QQQ", "SPY", "IOO"]
+GROWTH_SYMBOLS = ("QQQ", "SPY", "IOO")
+GROWTH_UNIVERSE = ("QQQ", "SPY", "IOO")
 
 # DEF Strategy - Defensive ETFs
 DEF_ALLOCATION = 0.03  # 3%
@@ -102,8 +119,8 @@ DEF_UP_TREND = True  # Enable uptrend filter
 DEF_MA_PERIOD = 100
 DEF_SINCE_TRUE = 5
 DEF_MIN_BARS = 250
-DEF_SYMBOLS = ["GLD", "TLT"]
-DEF_UNIVERSE = ["GLD", "TLT"]
+DEF_SYMBOLS = ("GLD", "TLT")
+DEF_UNIVERSE = ("GLD", "TLT")
 
 # BTC Strategy - Bitcoin
 BTC_ALLOCATION = 0.02  # 2%
@@ -114,7 +131,7 @@ BTC_MA_PERIOD = 100
 BTC_SINCE_TRUE = 4  # Must be true for 4 bars
 BTC_MIN_BARS = 50
 BTC_SYMBOL = "IBIT"
-BTC_UNIVERSE = ["IBIT"]
+BTC_UNIVERSE = ("IBIT",)
 
 # MR Long Strategy - Mean Reversion Longs (S&P 500)
 MR_ALLOCATION_LONG = 0.15  # 15%
@@ -182,35 +199,58 @@ HFT_SHORT_UNIVERSE = "Russell 1000"  # Norgate watchlist name
 # HELPER FUNCTIONS
 # ============================================================================
 
+class OrderRow(NamedTuple):
+    """One batch order CSV row; field order is the CSV column order."""
+    Symbol: str
+    Account: str
+    Action: str
+    Quantity: int
+    OrderType: str
+    LimitPrice: str
+    StopPrice: str
+    SecurityType: str
+    Exchange: str
+    Timezone: str
+    TimeInForce: str
+    GoodTillDate: str
+    AttachMOC: str
+    Strategy: str
+    OutsideRTH: str
+    AllOrNone: str
+    Hidden: str
+    DisplaySize: str
+    DisplaySizeIsPercentage: str
+
+
 def create_order_row(symbol, action, quantity, order_type, limit_price, strategy_name,
                      account="", security_type="STK", exchange="SMART", time_in_force="DAY",
                      good_till_date="", attach_moc="NO"):
     """
     Create a standardized order row for CSV output.
 
-    Returns a dictionary with all 19 required CSV columns (including Account).
+    Returns an OrderRow with all 19 required CSV columns (including Account).
     """
-    return {
-        "Symbol": symbol,
-        "Account": account,  # New column - leave blank for default account
-        "Action": action,
-        "Quantity": int(quantity),
-        "OrderType": order_type,
-        "LimitPrice": f"{limit_price:.2f}" if limit_price else "",
-        "StopPrice": "",
-        "SecurityType": security_type,
-        "Exchange": exchange,
-        "Timezone": "",
-        "TimeInForce": time_in_force,
-        "GoodTillDate": good_till_date,
-        "AttachMOC": attach_moc,
-        "Strategy": strategy_name,
-        "OutsideRTH": "NO",
-        "AllOrNone": "NO",
-        "Hidden": "NO",
-        "DisplaySize": "0",
-        "DisplaySizeIsPercentage": "NO"
-    }
+    return OrderRow(
+        Symbol=symbol,
+        Account=account,  # New column - leave blank for default account
+        Action=action,
+        Quantity=int(quantity),
+        OrderType=order_type,
+        LimitPrice=f"{limit_price:.2f}" if limit_price else "",
+        StopPrice="",
+        SecurityType=security_type,
+        Exchange=exchange,
+        Timezone="",
+        TimeInForce=time_in_force,
+        GoodTillDate=good_till_date,
+        AttachMOC=attach_moc,
+        Strategy=strategy_name,
+        OutsideRTH="NO",
+        AllOrNone="NO",
+        Hidden="NO",
+        DisplaySize="0",
+        DisplaySizeIsPercentage="NO"
+    )
 
 
 def calculate_gtd_time():
@@ -218,14 +258,17 @@ def calculate_gtd_time():
     Calculate Good Till Date for HFT orders.
     Returns today at 15:44 ET, or next trading day if after 15:44.
     """
-    et_tz = pytz.timezone('US/Eastern')
-    now_et = datetime.now(et_tz)
+    now_et = datetime.now(ET_TZ)
+    return _gtd_time_string(now_et.date(), now_et.time() > GTD_CUTOFF_ET)
+
 
-    # Target time is 15:44 ET
-    target_time = now_et.replace(hour=15, minute=44, second=0, microsecond=0)
+@lru_cache(maxsize=8)
+def _gtd_time_string(date_et, past_cutoff):
+    """GTD string for an ET date, rolled to the next day once the cutoff has passed."""
+    target_time = datetime.combine(date_et, GTD_CUTOFF_ET)
 
     # If it's already past 15:44, use tomorrow
-    if now_et > target_time:
+    if past_cutoff:
         target_time += timedelta(days=1)
 
     # Format: 2025-11-12T15:44 (no seconds, matching template format)
@@ -253,11 +296,226 @@ def get_current_positions_by_strategy(positions_list):
     return positions_by_strategy
 
 
+def position_quantities(current_positions_df):
+    """
+    Map each held symbol to its share count, built once per strategy so exit orders carry the real size.
+
+    Counts are unsigned (the order action sets the side); symbols with no known quantity are left out.
+
+    Returns:
+        dict: {symbol: shares}
+    """
+    if current_positions_df.empty or 'Quantity' not in current_positions_df.columns:
+        return {}
+    return {
+        symbol: abs(int(quantity))
+        for symbol, quantity in zip(current_positions_df['Symbol'], current_positions_df['Quantity'])
+        if pd.notna(quantity)
+    }
+
+
+def scan_universe(scan_symbol, symbols):
+    """
+    Run a per-symbol scan function over a universe concurrently.
+
+    Returns:
+        list: The non-None scan results, in universe order.
+    """
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        return [result for result in executor.map(scan_symbol, symbols) if result is not None]
+
+
+def top_ranked(candidates, key, n):
+    """
+    The n candidate dicts with the largest candidate[key], best first.
+
+    Same result as a stable sort on key (reverse=True) followed by [:n], without sorting the whole list.
+    """
+    return [candidates[i] for i in ind.top_n_indices([candidate[key] for candidate in candidates], n)]
+
+
+def fetch_scan_bars(symbol, min_bars, price_cache=None, bars=None):
+    """
+    Fetch min_bars + 1 bars (or bars, when given) for a universe scan as numpy arrays.
+
+    Symbols that were not prefetched are checked with du.has_min_history first, in the calling scan's worker thread,
+    so recent listings that could never pass the length check are not fetched.
+
+    Returns:
+        tuple: (symbol, du.BarData), or None if the fetch failed or returned fewer than min_bars bars.
+    """
+    if not (price_cache and symbol in price_cache) and not du.has_min_history(symbol, min_bars):
+        return None
+    try:
+        data = du.getData_prefetched(price_cache, symbol, bars or min_bars + 1)
+    except Exception:
+        return None
+    if len(data) < min_bars:
+        return None
+    return symbol, du.BarData(data.Close.values, data.High.values, data.Low.values, data.Volume.values, data.index[-1])
+
+
+def fetch_shared_scan_bars(price_cache=None):
+    """
+    Fetch the MR and HFT (long and short) universes in one pass, at the deepest of their lookbacks.
+
+    S&P 500 is a subset of the Russell 1000, so each symbol is fetched once and every scan takes its own tails
+    with scan_bars_tails.
+
+    Returns:
+        dict: {symbol: du.BarData} for every symbol with at least the shortest scan's minimum bars.
+    """
+    min_bars = min(MR_MIN_BARS, MR_SHORT_MIN_BARS, HFT_MIN_BARS, HFT_SHORT_MIN_BARS)
+    symbols = dict.fromkeys(
+        du.get_watchlist_symbols(MR_UNIVERSE)
+        + du.get_watchlist_symbols(MR_SHORT_UNIVERSE)
+        + du.get_watchlist_symbols(HFT_UNIVERSE)
+        + du.get_watchlist_symbols(HFT_SHORT_UNIVERSE)
+    )
+    return dict(scan_universe(
+        partial(fetch_scan_bars, min_bars=min_bars, price_cache=price_cache,
+                bars=max(MR_MIN_BARS, MR_SHORT_MIN_BARS, HFT_MIN_BARS, HFT_SHORT_MIN_BARS) + 1),
+        symbols,
+    ))
+
+
+def scan_bars_tails(scan_bars, symbols, min_bars):
+    """
+    The bars fetch_scan_bars(symbol, min_bars) would return, taken from a deeper fetch_shared_scan_bars result.
+
+    Recursive indicators (ATR, ADX, RSI) depend on how much history they see, so each scan keeps its own depth.
+    """
+    return {
+        symbol: du.tail_bars(scan_bars[symbol], min_bars + 1)
+        for symbol in symbols
+        if symbol in scan_bars and len(scan_bars[symbol].close) >= min_bars
+    }
+
+
+def previous_bar_value(symbol, field, scan_bars=None, price_cache=None):
+    """
+    Previous day's value of a bar field ('high' or 'low') for an exit limit.
+
+    Read from the shared scan bars when the symbol was scanned, so held positions in the scan universes need no
+    fetch of their own; other symbols fall back to a two-bar fetch.
+    """
+    bars = scan_bars.get(symbol) if scan_bars else None
+    if bars is not None:
+        return getattr(bars, field)[-2]
+    return getattr(du.getData_prefetched(price_cache, symbol, 2), field.capitalize()).values[-2]
+
+
+def create_indicator_pool():
+    """
+    Choose once per run where the indicator kernels execute, returning the pool to pass into the scans.
+
+    With numba (or a single CPU) the kernels run in-line and this returns None. Without it the pure-Python kernels
+    hold the GIL, so one pool of INDICATOR_PROCESSES worker processes is created for every strategy to share; the
+    caller shuts it down once the strategies have finished.
+
+    Workers are spawned rather than forked: they start on the first scan, from a strategy thread, while other threads
+    hold locks (and sys.stdout is swapped for the capture proxy) that a forked child would inherit.
+    """
+    if ind.NUMBA_AVAILABLE or INDICATOR_PROCESSES < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=INDICATOR_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+
+def panel_indicators(panel, indicator_spec, indicator_pool=None):
+    """
+    ind.last_bar_panel over one stacked BarData panel.
+
+    Given an indicator_pool (see create_indicator_pool), the panel's rows are split across its worker processes; each
+    row's values are independent of the others, so the result is the same.
+    """
+    arrays = (panel.high, panel.low, panel.close, panel.volume)
+    processes = min(INDICATOR_PROCESSES, len(panel.close))
+    recursive = any(kind not in ('sma', 'volume_sma') for kind, _ in indicator_spec.values())
+    if indicator_pool is None or not recursive or processes < 2:
+        return ind.last_bar_panel(*arrays, indicator_spec)
+    chunks = np.array_split(np.arange(len(panel.close)), processes)
+    parts = list(indicator_pool.map(
+        ind.last_bar_panel,
+        *([array[rows] for rows in chunks] for array in arrays),
+        repeat(indicator_spec, processes),
+    ))
+    return {name: np.concatenate([part[name] for part in parts]) for name in indicator_spec}
+
+
+def scan_fetched(scan_symbol, fetched, indicator_pool=None):
+    """
+    Apply a CPU-bound per-symbol scan, scan_symbol(symbol, bars), to fetched {symbol: BarData}.
+
+    Runs in-line without an indicator_pool, and across its worker processes with one; scan_symbol must then be a
+    module-level function (or a partial of one) so it can be pickled.
+
+    Returns:
+        list: The scan results that are not None, in the order of fetched.
+    """
+    if indicator_pool is None or len(fetched) < 2:
+        results = list(map(scan_symbol, fetched.keys(), fetched.values()))
+    else:
+        results = list(indicator_pool.map(scan_symbol, fetched.keys(), fetched.values(), chunksize=16))
+    return [result for result in results if result is not None]
+
+
+def last_bar_table(fetched, indicator_spec, indicator_pool=None):
+    """du.last_bar_table over fetched {symbol: BarData}, computing each panel's indicators with panel_indicators."""
+    return du.last_bar_table(fetched, indicator_spec, partial(panel_indicators, indicator_pool=indicator_pool))
+
+
+def join_indicators(table, fetched, indicator_spec, indicator_pool=None):
+    """
+    A last_bar_table result with the indicators in indicator_spec joined on, computed only for the symbols in it.
+
+    Lets a scan screen on cheap indicators first and run the recursive kernels only for the symbols that pass.
+    """
+    extra = last_bar_table({symbol: fetched[symbol] for symbol in table.index}, indicator_spec, indicator_pool)
+    return table.join(extra[list(indicator_spec)])
+
+
 # ============================================================================
 # STRATEGY IMPLEMENTATIONS
 # ============================================================================
 
-def run_momo_strategy(usable_capital, current_positions_df):
+def momo_data_end_date(today):
+    """MOMO rebalances on month-end data: this month's last Friday once it has passed, otherwise last month's."""
+    last_friday_current_month = du.get_last_friday_of_month(today)
+    if today > last_friday_current_month:
+        return last_friday_current_month
+    return du.get_last_friday_of_previous_month(today)
+
+
+def _scan_momo_symbol(symbol, data_end_date, momo_bullmkt, price_cache=None):
+    """Scan one MOMO symbol, returning its candidate dict or None; entries are sized after ranking."""
+    try:
+        if not (price_cache and symbol in price_cache) and not du.has_min_history(symbol, MOMO_MIN_BARS, data_end_date):
+            return None
+        data = du.getData_endDate_prefetched(price_cache, symbol, MOMO_MIN_BARS + 1, data_end_date)
+        if len(data) < MOMO_MIN_BARS:
+            return None
+
+        close = data.Close.values
+        c = close[-1]
+
+        # Calculate indicators
+        momo_ma = ind.sma_last(close, MOMO_MA_PERIOD)
+        momo_uptrend = c > momo_ma
+        momo_factor = 0.5 * ind.roc_last(close, MOMO_ROC_P1) + 0.5 * ind.roc_last(close, MOMO_ROC_P2)
+
+        # Check entry conditions
+        if momo_bullmkt and momo_factor > 0 and momo_uptrend:
+            return {
+                'Symbol': symbol,
+                'BuyPrice': c,
+                'MomoFactor': round(momo_factor, 3)
+            }
+    except Exception as e:
+        pass
+    return None
+
+
+def run_momo_strategy(usable_capital, current_positions_df, price_cache=None):
     """
     MOMO Strategy - Momentum Stocks (NASDAQ 100)
 
@@ -273,22 +531,16 @@ def run_momo_strategy(usable_capital, current_positions_df):
     orders = []
 
     # Get data end date for monthly rebalancing
-    today = datetime.now().date()
-    last_friday_current_month = du.get_last_friday_of_month(today)
-    last_friday_previous_month = du.get_last_friday_of_previous_month(today)
-
-    if today > last_friday_current_month:
-        data_end_date = last_friday_current_month
-    else:
-        data_end_date = last_friday_previous_month
+    data_end_date = momo_data_end_date(datetime.now().date())
 
     # Check bullish market condition if enabled
     momo_bullmkt = False
     if MOMO_BULL_MKT:
         try:
-            index_data = du.getData_endDate(MOMO_INDEX_SYMBOL, MOMO_INDEX_PERIOD + 5, data_end_date)
-            index_close = index_data.Close
-            momo_bullmkt = index_close.iloc[-1] > index_close.iloc[-1 - MOMO_INDEX_PERIOD]
+            index_data = du.getData_endDate_prefetched(price_cache, MOMO_INDEX_SYMBOL, MOMO_INDEX_PERIOD + 5,
+                                                       data_end_date)
+            index_close = index_data.Close.values
+            momo_bullmkt = index_close[-1] > index_close[-1 - MOMO_INDEX_PERIOD]
             print(f"Market Filter: {'BULLISH' if momo_bullmkt else 'BEARISH'} (NYSE H-L vs {MOMO_INDEX_PERIOD}-MA)")
         except Exception as e:
             print(f"Warning: Could not fetch market index data: {e}")
@@ -305,61 +557,42 @@ def run_momo_strategy(usable_capital, current_positions_df):
         # Since we don't have strategy name, we'll just track all for now
         current_momo_symbols = current_positions_df['Symbol'].tolist()
 
+    position_qty = position_quantities(current_positions_df)
+
     print(f"Current MOMO positions: {len(current_momo_symbols)}")
 
     # Scan universe and rank
-    momo_list = []
-    ticker_list = nd.watchlist_symbols(MOMO_UNIVERSE)
+    ticker_list = du.get_watchlist_symbols(MOMO_UNIVERSE)
     print(f"Scanning {len(ticker_list)} symbols...")
 
-    for symbol in ticker_list:
-        try:
-            data = du.getData_endDate(symbol, MOMO_MIN_BARS + 1, data_end_date)
-            if len(data) < MOMO_MIN_BARS:
-                continue
-
-            c = data.Close.iloc[-1]
-
-            # Calculate indicators
-            momo_ma = SMAIndicator(data.Close, MOMO_MA_PERIOD, True).sma_indicator().iloc[-1]
-            momo_uptrend = c > momo_ma
-            momo_factor = 0.5 * ind.ROC(data.Close, MOMO_ROC_P1) + 0.5 * ind.ROC(data.Close, MOMO_ROC_P2)
+    momo_list = scan_universe(
+        partial(_scan_momo_symbol, data_end_date=data_end_date, momo_bullmkt=momo_bullmkt, price_cache=price_cache),
+        ticker_list,
+    )
 
-            # Calculate position size
-            momo_buy_price = c
-            momo_quantity = int(usable_capital * MOMO_ALLOCATION / MOMO_MAX_POS / momo_buy_price)
-
-            # Check entry conditions
-            if momo_bullmkt and momo_factor > 0 and momo_uptrend:
-                momo_list.append({
-                    'Symbol': symbol,
-                    'Quantity': momo_quantity,
-                    'BuyPrice': momo_buy_price,
-                    'MomoFactor': round(momo_factor, 3)
-                })
-
-        except Exception as e:
-            continue
+    print(f"Qualified symbols: {len(momo_list)}")
 
-    # Sort by momentum factor
-    momo_list.sort(key=lambda x: x['MomoFactor'], reverse=True)
+    # Rank by momentum factor, keeping only as many as the hold buffer and entries need
+    momo_list = top_ranked(momo_list, 'MomoFactor', max(MOMO_WORST_RANK, MOMO_MAX_POS))
 
     # Get top symbols
     hold_symbols = [x['Symbol'] for x in momo_list[:MOMO_WORST_RANK]]
     entry_symbols = [x['Symbol'] for x in momo_list[:MOMO_MAX_POS]]
 
-    print(f"Qualified symbols: {len(momo_list)}")
     print(f"Top {MOMO_MAX_POS} symbols: {entry_symbols}")
     print(f"Hold buffer (top {MOMO_WORST_RANK}): {hold_symbols}")
 
+    # Sets for membership tests; the lists keep their order for the order output
+    hold_set = set(hold_symbols)
+    current_momo_set = set(current_momo_symbols)
+
     # Generate EXIT orders (for positions not in hold list)
     for symbol in current_momo_symbols:
-        if symbol not in hold_symbols:
-            # Get current quantity (we don't have it from IB API, use placeholder)
+        if symbol not in hold_set:
             orders.append(create_order_row(
                 symbol=symbol,
                 action="SELL",
-                quantity=100,  # TODO: Get actual quantity from position
+                quantity=position_qty.get(symbol, 100),
                 order_type="MARKET",
                 limit_price=None,
                 strategy_name="momo",
@@ -369,14 +602,15 @@ def run_momo_strategy(usable_capital, current_positions_df):
             ))
             print(f"  EXIT: {symbol} (no longer in top {MOMO_WORST_RANK})")
 
-    # Generate ENTRY orders (for new positions)
+    # Generate ENTRY orders (for new positions), sizing only the symbols actually bought
+    capital_per_pos = usable_capital * MOMO_ALLOCATION / MOMO_MAX_POS
     for item in momo_list[:MOMO_MAX_POS]:
         symbol = item['Symbol']
-        if symbol not in current_momo_symbols:
+        if symbol not in current_momo_set:
             orders.append(create_order_row(
                 symbol=symbol,
                 action="BUY",
-                quantity=item['Quantity'],
+                quantity=int(capital_per_pos / item['BuyPrice']),
                 order_type="MARKET",
                 limit_price=None,
                 strategy_name="momo",
@@ -390,7 +624,22 @@ def run_momo_strategy(usable_capital, current_positions_df):
     return orders
 
 
-def run_mr_long_strategy(usable_capital, current_positions_df):
+# Cheap last-bar indicators the MR Long scan screens on before computing the rest
+MR_LONG_SCREEN_INDICATORS = {
+    'ma': ('sma', MR_MA_PERIOD),
+    'avg_volume': ('volume_sma', MR_VOLUME_PERIOD),
+}
+
+# Remaining last-bar indicators for the symbols that pass the MR Long screen, joined on by join_indicators
+MR_LONG_INDICATORS = {
+    'atr': ('atr', MR_ATR_PERIOD),
+    'adx': ('adx', MR_ADX_PERIOD),
+    'rsi': ('rsi', MR_LONG_RSI_PERIOD),
+}
+
+
+def run_mr_long_strategy(usable_capital, current_positions_df, price_cache=None, scan_bars=None,
+                         indicator_pool=None):
     """
     MR Long Strategy - Mean Reversion Longs (S&P 500)
 
@@ -419,8 +668,7 @@ def run_mr_long_strategy(usable_capital, current_positions_df):
     exit_count = 0
     for symbol in mr_long_symbols:
         try:
-            data = du.getData(symbol, 3)
-            prev_high = data.High.iloc[-2]  # Previous day's high
+            prev_high = previous_bar_value(symbol, 'high', scan_bars, price_cache)  # Previous day's high
 
             orders.append(create_order_row(
                 symbol=symbol,
@@ -439,73 +687,62 @@ def run_mr_long_strategy(usable_capital, current_positions_df):
             print(f"  Warning: Could not generate exit for {symbol}: {e}")
 
     # Scan for ENTRY signals
-    ticker_list = nd.watchlist_symbols(MR_UNIVERSE)
+    ticker_list = du.get_watchlist_symbols(MR_UNIVERSE)
     print(f"\nScanning {len(ticker_list)} symbols for entries...")
 
-    entry_candidates = []
-
-    for symbol in ticker_list:
-        # Skip if already in position
-        if symbol in mr_long_symbols:
-            continue
-
-        # Skip GOOG (as in original)
-        if symbol == "GOOG":
-            continue
-
-        try:
-            data = du.getData(symbol, MR_MIN_BARS + 1)
-            if len(data) < MR_MIN_BARS:
-                continue
-
-            # Get latest values
-            c = data.Close.iloc[-1]
-            l = data.Low.iloc[-1]
-            h = data.High.iloc[-1]
-
-            # Calculate indicators
-            mr_atr = AverageTrueRange(data.High, data.Low, data.Close, MR_ATR_PERIOD, True).average_true_range().iloc[-1]
-            mr_ma = SMAIndicator(data.Close, MR_MA_PERIOD, True).sma_indicator().iloc[-1]
-            mr_adx = ADXIndicator(data.High, data.Low, data.Close, MR_ADX_PERIOD, fillna=True).adx().iloc[-1]
-            mr_avg_volume = SMAIndicator(data.Volume, MR_VOLUME_PERIOD, True).sma_indicator().iloc[-1]
-            mr_volatility = mr_atr / c * 100
-            mr_long_rsi = RSIIndicator(data.Close, MR_LONG_RSI_PERIOD, True).rsi().iloc[-1]
-
-            # Calculate entry limit price
-            mr_long_entry_limit = round(l - MR_LONG_STRETCH * mr_atr, 2)
-
-            # Calculate position size
-            mr_long_quantity = max(1, int(MR_ALLOCATION_LONG * usable_capital / MR_LONG_MAX_POS / mr_long_entry_limit))
-
-            # Check entry conditions
-            if (c > MR_MIN_PRICE and
-                mr_avg_volume > MR_VOLUME_LIMIT and
-                c > mr_ma and
-                mr_adx > MR_ADX_LIMIT and
-                mr_long_rsi < MR_LONG_RSI_LIMIT):
-
-                entry_candidates.append({
-                    'Symbol': symbol,
-                    'Quantity': mr_long_quantity,
-                    'EntryLimit': mr_long_entry_limit,
-                    'Volatility': round(mr_volatility, 3),
-                    'RSI': round(mr_long_rsi, 2)
-                })
-
-        except Exception as e:
-            continue
-
-    # Sort by volatility (higher volatility = higher rank)
-    entry_candidates.sort(key=lambda x: x['Volatility'], reverse=True)
-
-    # Take top positions up to max
+    # Skip symbols already in position, and GOOG (as in original)
+    skip_symbols = set(mr_long_symbols) | {"GOOG"}
+    scan_symbols = [symbol for symbol in ticker_list if symbol not in skip_symbols]
+    if scan_bars is None:
+        fetched = dict(scan_universe(
+            partial(fetch_scan_bars, min_bars=MR_MIN_BARS, price_cache=price_cache), scan_symbols
+        ))
+    else:
+        fetched = scan_bars_tails(scan_bars, scan_symbols, MR_MIN_BARS)
+
+    # Screen on price, volume and trend first, so ATR/ADX/RSI only run for the symbols that can still qualify
+    screen = last_bar_table(fetched, MR_LONG_SCREEN_INDICATORS, indicator_pool)
+    screen_mask = (
+        (screen['c'] > MR_MIN_PRICE) & (screen['avg_volume'] > MR_VOLUME_LIMIT) & (screen['c'] > screen['ma'])
+    )
+    table = join_indicators(screen[screen_mask], fetched, MR_LONG_INDICATORS, indicator_pool)
+
+    # Entry limit and ranking values for every symbol at once (Series.round matches round() on numpy floats)
+    table['entry_limit'] = (table['l'] - MR_LONG_STRETCH * table['atr']).round(2)
+    table['volatility'] = (table['atr'] / table['c'] * 100).round(3)
+
+    # Check the remaining entry conditions; a zero limit cannot be sized and was always skipped
+    entry_mask = (
+        (table['adx'] > MR_ADX_LIMIT)
+        & (table['rsi'] < MR_LONG_RSI_LIMIT)
+        & (table['entry_limit'] != 0)
+    )
+    entries = table[entry_mask]
+
+    # Take top positions up to max, by volatility (higher volatility = higher rank)
     num_open = len(mr_long_symbols)
-    num_to_add = min(len(entry_candidates), MR_LONG_MAX_POS - num_open)
+    num_to_add = min(len(entries), MR_LONG_MAX_POS - num_open)
 
-    print(f"Qualified entries: {len(entry_candidates)}")
+    print(f"Qualified entries: {len(entries)}")
     print(f"Can add: {num_to_add} (current: {num_open}, max: {MR_LONG_MAX_POS})")
 
-    for item in entry_candidates[:num_to_add]:
+    # Rank only the entries that will be used; the count matches slicing the ranked list with [:num_to_add]
+    entries = entries.iloc[ind.top_n_indices(entries['volatility'], len(entries.index[:num_to_add]))]
+    capital_per_pos = MR_ALLOCATION_LONG * usable_capital / MR_LONG_MAX_POS
+    entry_candidates = [
+        {
+            'Symbol': symbol,
+            'Quantity': max(1, int(capital_per_pos / entry_limit)),
+            'EntryLimit': entry_limit,
+            'Volatility': volatility,
+            'RSI': rsi,
+        }
+        for symbol, entry_limit, volatility, rsi in zip(
+            entries.index, entries['entry_limit'], entries['volatility'], entries['rsi'].round(2)
+        )
+    ]
+
+    for item in entry_candidates:
         orders.append(create_order_row(
             symbol=item['Symbol'],
             action="BUY",
@@ -523,7 +760,21 @@ def run_mr_long_strategy(usable_capital, current_positions_df):
     return orders
 
 
-def run_hft_long_strategy(usable_capital, current_positions_df):
+# Cheap last-bar indicators the HFT Long scan screens on before computing the rest
+HFT_LONG_SCREEN_INDICATORS = {
+    'ma': ('sma', HFT_MA_PERIOD),
+    'avg_volume': ('volume_sma', HFT_VOLUME_PERIOD),
+}
+
+# Remaining last-bar indicators for the symbols that pass the HFT Long screen, joined on by join_indicators
+HFT_LONG_INDICATORS = {
+    'atr': ('atr', HFT_ATR_PERIOD),
+    'adx': ('adx', HFT_ADX_PERIOD),
+}
+
+
+def run_hft_long_strategy(usable_capital, current_positions_df, price_cache=None, scan_bars=None,
+                          indicator_pool=None):
     """
     HFT Long Strategy - High Frequency Longs (Russell 1000)
 
@@ -549,73 +800,69 @@ def run_hft_long_strategy(usable_capital, current_positions_df):
     print(f"GTD Time: {gtd_time}")
 
     # Scan for entries
-    ticker_list = nd.watchlist_symbols(HFT_UNIVERSE)
+    ticker_list = du.get_watchlist_symbols(HFT_UNIVERSE)
     print(f"Scanning {len(ticker_list)} symbols...")
 
-    entry_candidates = []
-
-    for symbol in ticker_list:
-        # Skip if already in position
-        if symbol in hft_long_symbols:
-            continue
-
-        try:
-            data = du.getData(symbol, HFT_MIN_BARS + 1)
-            if len(data) < HFT_MIN_BARS:
-                continue
-
-            # Get latest values
-            c = data.Close.iloc[-1]
-            l = data.Low.iloc[-1]
-            h = data.High.iloc[-1]
-
-            # Price range filter
-            if c < HFT_LONG_MIN_PRICE or c > HFT_LONG_MAX_PRICE:
-                continue
-
-            # Calculate indicators
-            hft_atr = AverageTrueRange(data.High, data.Low, data.Close, HFT_ATR_PERIOD, True).average_true_range().iloc[-1]
-            hft_ma = SMAIndicator(data.Close, HFT_MA_PERIOD, True).sma_indicator().iloc[-1]
-            hft_adx = ADXIndicator(data.High, data.Low, data.Close, HFT_ADX_PERIOD, fillna=True).adx().iloc[-1]
-            hft_avg_volume = SMAIndicator(data.Volume, HFT_VOLUME_PERIOD, True).sma_indicator().iloc[-1]
-            hft_volatility = hft_atr / c * 100
-            hft_ibr = ind.IBR(h, l, c)
-
-            # Calculate entry limit price with tick size rounding
-            hft_long_entry_limit = l - HFT_LONG_STRETCH * hft_atr
-            tick_size = ind.tickSize(hft_long_entry_limit)
-            hft_long_entry_limit = round(hft_long_entry_limit / tick_size) * tick_size
-
-            # Calculate position size
-            hft_long_quantity = max(1, int(HFT_ALLOCATION_LONG * usable_capital / HFT_LONG_MAX_POS / hft_long_entry_limit))
-
-            # Check entry conditions
-            if (hft_avg_volume > HFT_VOLUME_LIMIT and
-                c > hft_ma and
-                hft_adx > HFT_ADX_LIMIT and
-                hft_ibr < HFT_LONG_IBR_LIMIT):
-
-                entry_candidates.append({
-                    'Symbol': symbol,
-                    'Quantity': hft_long_quantity,
-                    'EntryLimit': hft_long_entry_limit,
-                    'Volatility': round(hft_volatility, 3),
-                    'IBR': round(hft_ibr, 3)
-                })
-
-        except Exception as e:
-            continue
-
-    # Sort by volatility
-    entry_candidates.sort(key=lambda x: x['Volatility'], reverse=True)
-
-    # Take top positions
-    num_to_add = min(len(entry_candidates), HFT_LONG_MAX_POS)
-
-    print(f"Qualified entries: {len(entry_candidates)}")
+    # Skip symbols already in position
+    hft_long_set = set(hft_long_symbols)
+    scan_symbols = [symbol for symbol in ticker_list if symbol not in hft_long_set]
+    if scan_bars is None:
+        fetched = dict(scan_universe(
+            partial(fetch_scan_bars, min_bars=HFT_MIN_BARS, price_cache=price_cache), scan_symbols
+        ))
+    else:
+        fetched = scan_bars_tails(scan_bars, scan_symbols, HFT_MIN_BARS)
+
+    # Screen on price, volume and trend first, so ATR/ADX only run for the symbols that can still qualify
+    screen = last_bar_table(fetched, HFT_LONG_SCREEN_INDICATORS, indicator_pool)
+    screen_mask = (
+        (screen['c'] >= HFT_LONG_MIN_PRICE)
+        & (screen['c'] <= HFT_LONG_MAX_PRICE)
+        & (screen['avg_volume'] > HFT_VOLUME_LIMIT)
+        & (screen['c'] > screen['ma'])
+    )
+    table = join_indicators(screen[screen_mask], fetched, HFT_LONG_INDICATORS, indicator_pool)
+
+    # A zero-range bar gives a NaN/inf IBR, which fails the IBR check as before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['ibr'] = ind.IBR(table['h'], table['l'], table['c'])
+
+    # Entry limit with tick size rounding, and ranking values, for every symbol at once
+    entry_limit = table['l'] - HFT_LONG_STRETCH * table['atr']
+    tick_size = ind.tickSize_array(entry_limit)
+    table['entry_limit'] = np.round(entry_limit / tick_size) * tick_size
+    table['volatility'] = (table['atr'] / table['c'] * 100).round(3)
+
+    # Check the remaining entry conditions; a zero limit cannot be sized and was always skipped
+    entry_mask = (
+        (table['adx'] > HFT_ADX_LIMIT)
+        & (table['ibr'] < HFT_LONG_IBR_LIMIT)
+        & (table['entry_limit'] != 0)
+    )
+    entries = table[entry_mask]
+
+    # Take top positions, by volatility
+    num_to_add = min(len(entries), HFT_LONG_MAX_POS)
+
+    print(f"Qualified entries: {len(entries)}")
     print(f"Taking top {num_to_add}")
 
-    for item in entry_candidates[:num_to_add]:
+    entries = entries.iloc[ind.top_n_indices(entries['volatility'], num_to_add)]
+    capital_per_pos = HFT_ALLOCATION_LONG * usable_capital / HFT_LONG_MAX_POS
+    entry_candidates = [
+        {
+            'Symbol': symbol,
+            'Quantity': max(1, int(capital_per_pos / entry_limit)),
+            'EntryLimit': entry_limit,
+            'Volatility': volatility,
+            'IBR': ibr,
+        }
+        for symbol, entry_limit, volatility, ibr in zip(
+            entries.index, entries['entry_limit'], entries['volatility'], entries['ibr'].round(3)
+        )
+    ]
+
+    for item in entry_candidates:
         orders.append(create_order_row(
             symbol=item['Symbol'],
             action="BUY",
@@ -635,61 +882,83 @@ def run_hft_long_strategy(usable_capital, current_positions_df):
     return orders
 
 
-def run_growth_strategy(usable_capital, current_positions_df):
+class EtfRotation(NamedTuple):
+    """Parameters of an ETF rotation strategy: hold the one ETF with the highest ROC, if any qualify."""
+    name: str
+    description: str
+    strategy_name: str
+    symbols: tuple
+    allocation: float
+    roc_period: int
+    uptrend: bool
+    ma_period: int
+    min_bars: int
+
+
+GROWTH_ROTATION = EtfRotation(
+    name="GROWTH", description="Growth ETFs", strategy_name="growth", symbols=GROWTH_SYMBOLS,
+    allocation=GROWTH_ALLOCATION, roc_period=GROWTH_ROC_PERIOD, uptrend=GROWTH_UPTREND,
+    ma_period=GROWTH_MA_PERIOD, min_bars=GROWTH_MIN_BARS,
+)
+
+DEF_ROTATION = EtfRotation(
+    name="DEF", description="Defensive ETFs", strategy_name="def", symbols=DEF_SYMBOLS,
+    allocation=DEF_ALLOCATION, roc_period=DEF_ROC_PERIOD, uptrend=DEF_UPTREND,
+    ma_period=DEF_MA_PERIOD, min_bars=DEF_MIN_BARS,
+)
+
+
+def run_etf_rotation_strategy(rotation, usable_capital, current_positions_df, price_cache=None):
     """
-    GROWTH Strategy - Growth ETFs (QQQ, SPY, IOO)
+    ETF rotation shared by GROWTH and DEF, driven by an EtfRotation.
 
-    Entry: ROC > 0 (positive momentum)
+    Entry: ROC > 0 (positive momentum) and, if enabled, Price > MA
     Hold: Single ETF with highest ROC
     Exit: If not the highest ROC
     """
     print("\n" + "=" * 80)
-    print("GROWTH STRATEGY - Growth ETFs (QQQ, SPY, IOO)")
+    print(f"{rotation.name} STRATEGY - {rotation.description} ({', '.join(rotation.symbols)})")
     print("=" * 80)
 
     orders = []
 
-    # Get current GROWTH position
-    current_growth_symbol = None
+    # Get the current position in any of the rotation's ETFs
+    current_symbol = None
     if not current_positions_df.empty:
-        # Check if we have any of the GROWTH ETFs
-        growth_positions = current_positions_df[current_positions_df['Symbol'].isin(GROWTH_SYMBOLS)]
-        if not growth_positions.empty:
-            current_growth_symbol = growth_positions['Symbol'].iloc[0]
+        held_positions = current_positions_df[current_positions_df['Symbol'].isin(rotation.symbols)]
+        if not held_positions.empty:
+            current_symbol = held_positions['Symbol'].iloc[0]
 
-    print(f"Current GROWTH position: {current_growth_symbol if current_growth_symbol else 'None'}")
+    print(f"Current {rotation.name} position: {current_symbol if current_symbol else 'None'}")
+    current_quantity = position_quantities(current_positions_df).get(current_symbol, 100)
 
-    # Scan GROWTH ETFs and rank by ROC
-    growth_list = []
+    # Scan the ETFs and rank by ROC
+    etf_list = []
 
-    for symbol in GROWTH_SYMBOLS:
+    for symbol in rotation.symbols:
         try:
-            data = du.getData(symbol, GROWTH_MIN_BARS + 1)
-            if len(data) < GROWTH_MIN_BARS:
+            data = du.getData_prefetched(price_cache, symbol, rotation.min_bars + 1)
+            if len(data) < rotation.min_bars:
                 continue
 
-            c = data.Close.iloc[-1]
+            close = data.Close.values
+            c = close[-1]
 
             # Calculate ROC
-            roc = ind.ROC(data.Close, GROWTH_ROC_PERIOD)
+            roc = ind.roc_last(close, rotation.roc_period)
 
             # Check uptrend if enabled
-            if GROWTH_UPTREND:
-                growth_ma = SMAIndicator(data.Close, GROWTH_MA_PERIOD, True).sma_indicator().iloc[-1]
-                uptrend = c > growth_ma
+            if rotation.uptrend:
+                etf_ma = ind.sma_last(close, rotation.ma_period)
+                uptrend = c > etf_ma
             else:
                 uptrend = True
 
-            # Calculate position size (100% allocation to 1 ETF)
-            buy_price = c
-            quantity = int(usable_capital * GROWTH_ALLOCATION / buy_price)
-
             # Check entry conditions
             if roc > 0 and uptrend:
-                growth_list.append({
+                etf_list.append({
                     'Symbol': symbol,
-                    'Quantity': quantity,
-                    'BuyPrice': buy_price,
+                    'BuyPrice': c,
                     'ROC': round(roc, 3)
                 })
 
@@ -697,187 +966,86 @@ def run_growth_strategy(usable_capital, current_positions_df):
             print(f"Warning: Could not process {symbol}: {e}")
             continue
 
-    # Sort by ROC
-    growth_list.sort(key=lambda x: x['ROC'], reverse=True)
-
-    print(f"Qualified ETFs: {len(growth_list)}")
+    print(f"Qualified ETFs: {len(etf_list)}")
 
-    if growth_list:
-        best_etf = growth_list[0]
+    if etf_list:
+        # Highest ROC; ties go to the earlier ETF, as with a stable sort
+        best_etf = top_ranked(etf_list, 'ROC', 1)[0]
         print(f"Best ETF: {best_etf['Symbol']} (ROC: {best_etf['ROC']})")
 
         # Generate EXIT order if we're holding a different ETF
-        if current_growth_symbol and current_growth_symbol != best_etf['Symbol']:
+        if current_symbol and current_symbol != best_etf['Symbol']:
             orders.append(create_order_row(
-                symbol=current_growth_symbol,
+                symbol=current_symbol,
                 action="SELL",
-                quantity=100,  # TODO: Get actual quantity from position
+                quantity=current_quantity,
                 order_type="MARKET",
                 limit_price=None,
-                strategy_name="growth",
+                strategy_name=rotation.strategy_name,
                 security_type="STK",
                 exchange="SMART",
                 time_in_force="DAY"
             ))
-            print(f"  EXIT: {current_growth_symbol} (no longer best performer)")
+            print(f"  EXIT: {current_symbol} (no longer best performer)")
 
         # Generate ENTRY order if we don't have a position or need to switch
-        if not current_growth_symbol or current_growth_symbol != best_etf['Symbol']:
+        if not current_symbol or current_symbol != best_etf['Symbol']:
             orders.append(create_order_row(
                 symbol=best_etf['Symbol'],
                 action="BUY",
-                quantity=best_etf['Quantity'],
+                quantity=int(usable_capital * rotation.allocation / best_etf['BuyPrice']),  # 100% allocation to 1 ETF
                 order_type="MARKET",
                 limit_price=None,
-                strategy_name="growth",
+                strategy_name=rotation.strategy_name,
                 security_type="STK",
                 exchange="SMART",
                 time_in_force="DAY"
             ))
             print(f"  ENTRY: {best_etf['Symbol']} @ Market (ROC: {best_etf['ROC']})")
     else:
-        print("No qualified GROWTH ETFs")
+        print(f"No qualified {rotation.name} ETFs")
         # If we have a position but no qualified ETFs, exit
-        if current_growth_symbol:
+        if current_symbol:
             orders.append(create_order_row(
-                symbol=current_growth_symbol,
+                symbol=current_symbol,
                 action="SELL",
-                quantity=100,
+                quantity=current_quantity,
                 order_type="MARKET",
                 limit_price=None,
-                strategy_name="growth",
+                strategy_name=rotation.strategy_name,
                 security_type="STK",
                 exchange="SMART",
                 time_in_force="DAY"
             ))
-            print(f"  EXIT: {current_growth_symbol} (no qualified ETFs)")
+            print(f"  EXIT: {current_symbol} (no qualified ETFs)")
 
-    print(f"\nGenerated {len(orders)} GROWTH orders")
+    print(f"\nGenerated {len(orders)} {rotation.name} orders")
     return orders
 
 
-def run_def_strategy(usable_capital, current_positions_df):
+def run_growth_strategy(usable_capital, current_positions_df, price_cache=None):
     """
-    DEF Strategy - Defensive ETFs (GLD, TLT)
+    GROWTH Strategy - Growth ETFs (QQQ, SPY, IOO)
 
     Entry: ROC > 0 (positive momentum)
     Hold: Single ETF with highest ROC
     Exit: If not the highest ROC
     """
-    print("\n" + "=" * 80)
-    print("DEF STRATEGY - Defensive ETFs (GLD, TLT)")
-    print("=" * 80)
-
-    orders = []
+    return run_etf_rotation_strategy(GROWTH_ROTATION, usable_capital, current_positions_df, price_cache)
 
-    # Get current DEF position
-    current_def_symbol = None
-    if not current_positions_df.empty:
-        # Check if we have any of the DEF ETFs
-        def_positions = current_positions_df[current_positions_df['Symbol'].isin(DEF_SYMBOLS)]
-        if not def_positions.empty:
-            current_def_symbol = def_positions['Symbol'].iloc[0]
-
-    print(f"Current DEF position: {current_def_symbol if current_def_symbol else 'None'}")
-
-    # Scan DEF ETFs and rank by ROC
-    def_list = []
-
-    for symbol in DEF_SYMBOLS:
-        try:
-            data = du.getData(symbol, DEF_MIN_BARS + 1)
-            if len(data) < DEF_MIN_BARS:
-                continue
 
-            c = data.Close.iloc[-1]
-
-            # Calculate ROC
-            roc = ind.ROC(data.Close, DEF_ROC_PERIOD)
-
-            # Check uptrend if enabled
-            if DEF_UPTREND:
-                def_ma = SMAIndicator(data.Close, DEF_MA_PERIOD, True).sma_indicator().iloc[-1]
-                uptrend = c > def_ma
-            else:
-                uptrend = True
-
-            # Calculate position size (100% allocation to 1 ETF)
-            buy_price = c
-            quantity = int(usable_capital * DEF_ALLOCATION / buy_price)
-
-            # Check entry conditions
-            if roc > 0 and uptrend:
-                def_list.append({
-                    'Symbol': symbol,
-                    'Quantity': quantity,
-                    'BuyPrice': buy_price,
-                    'ROC': round(roc, 3)
-                })
-
-        except Exception as e:
-            print(f"Warning: Could not process {symbol}: {e}")
-            continue
-
-    # Sort by ROC
-    def_list.sort(key=lambda x: x['ROC'], reverse=True)
-
-    print(f"Qualified ETFs: {len(def_list)}")
-
-    if def_list:
-        best_etf = def_list[0]
-        print(f"Best ETF: {best_etf['Symbol']} (ROC: {best_etf['ROC']})")
-
-        # Generate EXIT order if we're holding a different ETF
-        if current_def_symbol and current_def_symbol != best_etf['Symbol']:
-            orders.append(create_order_row(
-                symbol=current_def_symbol,
-                action="SELL",
-                quantity=100,  # TODO: Get actual quantity from position
-                order_type="MARKET",
-                limit_price=None,
-                strategy_name="def",
-                security_type="STK",
-                exchange="SMART",
-                time_in_force="DAY"
-            ))
-            print(f"  EXIT: {current_def_symbol} (no longer best performer)")
-
-        # Generate ENTRY order if we don't have a position or need to switch
-        if not current_def_symbol or current_def_symbol != best_etf['Symbol']:
-            orders.append(create_order_row(
-                symbol=best_etf['Symbol'],
-                action="BUY",
-                quantity=best_etf['Quantity'],
-                order_type="MARKET",
-                limit_price=None,
-                strategy_name="def",
-                security_type="STK",
-                exchange="SMART",
-                time_in_force="DAY"
-            ))
-            print(f"  ENTRY: {best_etf['Symbol']} @ Market (ROC: {best_etf['ROC']})")
-    else:
-        print("No qualified DEF ETFs")
-        # If we have a position but no qualified ETFs, exit
-        if current_def_symbol:
-            orders.append(create_order_row(
-                symbol=current_def_symbol,
-                action="SELL",
-                quantity=100,
-                order_type="MARKET",
-                limit_price=None,
-                strategy_name="def",
-                security_type="STK",
-                exchange="SMART",
-                time_in_force="DAY"
-            ))
-            print(f"  EXIT: {current_def_symbol} (no qualified ETFs)")
+def run_def_strategy(usable_capital, current_positions_df, price_cache=None):
+    """
+    DEF Strategy - Defensive ETFs (GLD, TLT)
 
-    print(f"\nGenerated {len(orders)} DEF orders")
-    return orders
+    Entry: ROC > 0 (positive momentum)
+    Hold: Single ETF with highest ROC
+    Exit: If not the highest ROC
+    """
+    return run_etf_rotation_strategy(DEF_ROTATION, usable_capital, current_positions_df, price_cache)
 
 
-def run_btc_strategy(usable_capital, current_positions_df):
+def run_btc_strategy(usable_capital, current_positions_df, price_cache=None):
     """
     BTC Strategy - Bitcoin Exposure via IBIT ETF
 
@@ -898,22 +1066,24 @@ def run_btc_strategy(usable_capital, current_positions_df):
         current_btc_position = not btc_positions.empty
 
     print(f"Current BTC position: {'Yes' if current_btc_position else 'No'}")
+    current_btc_quantity = position_quantities(current_positions_df).get(BTC_SYMBOL, 100)
 
     try:
-        data = du.getData(BTC_SYMBOL, BTC_MIN_BARS + 1)
+        data = du.getData_prefetched(price_cache, BTC_SYMBOL, BTC_MIN_BARS + 1)
 
         if len(data) < BTC_MIN_BARS:
             print(f"Insufficient data for {BTC_SYMBOL}")
             return orders
 
-        c = data.Close.iloc[-1]
+        close = data.Close.values
+        c = close[-1]
 
         # Calculate ROC
-        roc = ind.ROC(data.Close, BTC_ROC_PERIOD)
+        roc = ind.roc_last(close, BTC_ROC_PERIOD)
 
         # Check uptrend if enabled
         if BTC_UPTREND:
-            btc_ma = SMAIndicator(data.Close, BTC_MA_PERIOD, True).sma_indicator().iloc[-1]
+            btc_ma = ind.sma_last(close, BTC_MA_PERIOD)
             uptrend = c > btc_ma
         else:
             uptrend = True
@@ -948,7 +1118,7 @@ def run_btc_strategy(usable_capital, current_positions_df):
                 orders.append(create_order_row(
                     symbol=BTC_SYMBOL,
                     action="SELL",
-                    quantity=100,  # TODO: Get actual quantity
+                    quantity=current_btc_quantity,
                     order_type="MARKET",
                     limit_price=None,
                     strategy_name="btc",
@@ -967,7 +1137,49 @@ def run_btc_strategy(usable_capital, current_positions_df):
     return orders
 
 
-def run_mr_short_strategy(usable_capital, current_positions_df):
+def _scan_mr_short_symbol(symbol, bars, usable_capital):
+    """Scan one MR Short symbol's fetched bars, returning its candidate dict or None."""
+    try:
+        c = bars.close[-1]
+        h = bars.high[-1]
+        vol = bars.volume[-1]
+
+        # Price and volume filters
+        if c < MR_SHORT_MIN_PRICE or vol < MR_SHORT_MIN_VOL:
+            return None
+
+        # Calculate indicators, cheapest first, stopping at the first failed entry condition
+        mr_ma = ind.sma_last(bars.close, MR_SHORT_MA_PERIOD)
+        if not c > mr_ma:
+            return None
+        rsi = ind.rsi_last(bars.close, MR_SHORT_RSI_PERIOD)
+        if not rsi > MR_SHORT_RSI_LIMIT:
+            return None
+        atr, adx = ind.atr_adx_last(bars.high, bars.low, bars.close, MR_SHORT_ATR_PERIOD, MR_SHORT_ADX_PERIOD)
+
+        # Entry conditions: Price > MA, ADX > 30, RSI > 90 (overbought)
+        if adx > MR_SHORT_ADX_LIMIT:
+            entry_limit = h + MR_SHORT_STRETCH * atr
+            exit_limit = bars.low[-2]  # Previous day's low
+
+            quantity = int(usable_capital * MR_SHORT_ALLOCATION / MR_SHORT_MAX_POS / entry_limit)
+
+            return {
+                'Symbol': symbol,
+                'Quantity': quantity,
+                'EntryLimit': entry_limit,
+                'ExitLimit': exit_limit,
+                'RSI': np.round(rsi, 2),
+                'ADX': np.round(adx, 2)
+            }
+
+    except Exception:
+        pass
+    return None
+
+
+def run_mr_short_strategy(usable_capital, current_positions_df, price_cache=None, scan_bars=None,
+                          indicator_pool=None):
     """
     MR Short Strategy - Mean Reversion Shorts (S&P 500)
 
@@ -988,74 +1200,42 @@ def run_mr_short_strategy(usable_capital, current_positions_df):
         # We'd need strategy info to filter properly
         # For now, assume any S&P 500 stock could be MR short
         mr_short_symbols = current_positions_df['Symbol'].tolist()
-        for _, row in current_positions_df.iterrows():
-            mr_short_positions[row['Symbol']] = row.get('Quantity', 100)
+        mr_short_positions = position_quantities(current_positions_df)
 
     print(f"Current MR short positions: {len(mr_short_symbols)}")
 
     # Scan universe
-    mr_short_list = []
-    ticker_list = nd.watchlist_symbols(MR_SHORT_UNIVERSE)
+    ticker_list = du.get_watchlist_symbols(MR_SHORT_UNIVERSE)
     print(f"Scanning {len(ticker_list)} symbols...")
 
-    for symbol in ticker_list:
-        try:
-            data = du.getData(symbol, MR_SHORT_MIN_BARS + 1)
-            if len(data) < MR_SHORT_MIN_BARS:
-                continue
-
-            c = data.Close.iloc[-1]
-            h = data.High.iloc[-1]
-            l = data.Low.iloc[-1]
-            vol = data.Volume.iloc[-1]
-
-            # Price and volume filters
-            if c < MR_SHORT_MIN_PRICE or vol < MR_SHORT_MIN_VOL:
-                continue
-
-            # Calculate indicators
-            mr_ma = SMAIndicator(data.Close, MR_SHORT_MA_PERIOD, True).sma_indicator().iloc[-1]
-            rsi = RSIIndicator(data.Close, MR_SHORT_RSI_PERIOD, True).rsi().iloc[-1]
-            adx = ADXIndicator(data.High, data.Low, data.Close, MR_SHORT_ADX_PERIOD, True).adx().iloc[-1]
-            atr = AverageTrueRange(data.High, data.Low, data.Close, MR_SHORT_ATR_PERIOD, True).average_true_range().iloc[-1]
-
-            # Entry conditions: Price > MA, ADX > 30, RSI > 90 (overbought)
-            if c > mr_ma and adx > MR_SHORT_ADX_LIMIT and rsi > MR_SHORT_RSI_LIMIT:
-                entry_limit = h + MR_SHORT_STRETCH * atr
-                exit_limit = data.Low.iloc[-2]  # Previous day's low
-
-                quantity = int(usable_capital * MR_SHORT_ALLOCATION / MR_SHORT_MAX_POS / entry_limit)
-
-                mr_short_list.append({
-                    'Symbol': symbol,
-                    'Quantity': quantity,
-                    'EntryLimit': entry_limit,
-                    'ExitLimit': exit_limit,
-                    'RSI': round(rsi, 2),
-                    'ADX': round(adx, 2)
-                })
-
-        except Exception as e:
-            continue
+    if scan_bars is None:
+        fetched = dict(scan_universe(
+            partial(fetch_scan_bars, min_bars=MR_SHORT_MIN_BARS, price_cache=price_cache), ticker_list
+        ))
+    else:
+        fetched = scan_bars_tails(scan_bars, ticker_list, MR_SHORT_MIN_BARS)
+    mr_short_list = scan_fetched(
+        partial(_scan_mr_short_symbol, usable_capital=usable_capital), fetched, indicator_pool
+    )
 
     print(f"Qualified symbols: {len(mr_short_list)}")
 
-    # Sort by RSI (highest first - most overbought)
-    mr_short_list.sort(key=lambda x: x['RSI'], reverse=True)
-
-    # Take top positions up to max
-    entry_candidates = mr_short_list[:MR_SHORT_MAX_POS]
+    # Take top positions up to max, by RSI (highest first - most overbought)
+    entry_candidates = top_ranked(mr_short_list, 'RSI', MR_SHORT_MAX_POS)
     entry_symbols = [x['Symbol'] for x in entry_candidates]
 
     print(f"Top {min(len(entry_candidates), MR_SHORT_MAX_POS)} short candidates: {entry_symbols[:5]}...")
 
+    # Sets for membership tests; the lists keep their order for the order output
+    entry_set = set(entry_symbols)
+    mr_short_set = set(mr_short_symbols)
+
     # Generate EXIT orders for existing positions
     for symbol in mr_short_symbols:
-        if symbol not in entry_symbols:
+        if symbol not in entry_set:
             # Find exit price
             try:
-                data = du.getData(symbol, 2)
-                exit_limit = data.Low.iloc[-2]
+                exit_limit = previous_bar_value(symbol, 'low', scan_bars, price_cache)
 
                 orders.append(create_order_row(
                     symbol=symbol,
@@ -1075,7 +1255,7 @@ def run_mr_short_strategy(usable_capital, current_positions_df):
     # Generate ENTRY orders for new positions
     for item in entry_candidates:
         symbol = item['Symbol']
-        if symbol not in mr_short_symbols:
+        if symbol not in mr_short_set:
             orders.append(create_order_row(
                 symbol=symbol,
                 action="SELL",  # SELL to open short
@@ -1093,7 +1273,20 @@ def run_mr_short_strategy(usable_capital, current_positions_df):
     return orders
 
 
-def run_hft_short_strategy(usable_capital, current_positions_df):
+# Cheap last-bar indicators the HFT Short scan screens on before computing the rest
+HFT_SHORT_SCREEN_INDICATORS = {
+    'ma': ('sma', HFT_SHORT_MA_PERIOD),
+}
+
+# Remaining last-bar indicators for the symbols that pass the HFT Short screen, joined on by join_indicators
+HFT_SHORT_INDICATORS = {
+    'atr': ('atr', HFT_SHORT_ATR_PERIOD),
+    'adx': ('adx', HFT_SHORT_ADX_PERIOD),
+}
+
+
+def run_hft_short_strategy(usable_capital, current_positions_df, price_cache=None, scan_bars=None,
+                           indicator_pool=None):
     """
     HFT Short Strategy - High Frequency Shorts (Russell 1000)
 
@@ -1112,8 +1305,7 @@ def run_hft_short_strategy(usable_capital, current_positions_df):
     hft_short_positions = {}
     if not current_positions_df.empty:
         hft_short_symbols = current_positions_df['Symbol'].tolist()
-        for _, row in current_positions_df.iterrows():
-            hft_short_positions[row['Symbol']] = row.get('Quantity', 100)
+        hft_short_positions = position_quantities(current_positions_df)
 
     print(f"Current HFT short positions: {len(hft_short_symbols)}")
 
@@ -1121,59 +1313,57 @@ def run_hft_short_strategy(usable_capital, current_positions_df):
     gtd_time = calculate_gtd_time()
 
     # Scan universe
-    hft_short_list = []
-    ticker_list = nd.watchlist_symbols(HFT_SHORT_UNIVERSE)
+    ticker_list = du.get_watchlist_symbols(HFT_SHORT_UNIVERSE)
     print(f"Scanning {len(ticker_list)} symbols...")
 
-    for symbol in ticker_list:
-        try:
-            data = du.getData(symbol, HFT_SHORT_MIN_BARS + 1)
-            if len(data) < HFT_SHORT_MIN_BARS:
-                continue
-
-            c = data.Close.iloc[-1]
-            h = data.High.iloc[-1]
-            l = data.Low.iloc[-1]
-            vol = data.Volume.iloc[-1]
-
-            # Price and volume filters
-            if c < HFT_SHORT_MIN_PRICE or c > HFT_SHORT_MAX_PRICE or vol < HFT_SHORT_MIN_VOL:
-                continue
-
-            # Calculate indicators
-            hft_ma = SMAIndicator(data.Close, HFT_SHORT_MA_PERIOD, True).sma_indicator().iloc[-1]
-            adx = ADXIndicator(data.High, data.Low, data.Close, HFT_SHORT_ADX_PERIOD, True).adx().iloc[-1]
-            atr = AverageTrueRange(data.High, data.Low, data.Close, HFT_SHORT_ATR_PERIOD, True).average_true_range().iloc[-1]
-
-            # Calculate IBR (Intrabar Range)
-            ibr = ind.IBR(h, l, c)
-
-            # Entry conditions: Price > MA, ADX > 35, IBR > 0.7 (closed near high)
-            if c > hft_ma and adx > HFT_SHORT_ADX_LIMIT and ibr > HFT_SHORT_IBR_LIMIT:
-                entry_limit = h + HFT_SHORT_STRETCH * atr
-                volatility = atr / c * 100
-
-                quantity = int(usable_capital * HFT_ALLOCATION_SHORT / HFT_SHORT_MAX_POS / entry_limit)
-
-                hft_short_list.append({
-                    'Symbol': symbol,
-                    'Quantity': quantity,
-                    'EntryLimit': entry_limit,
-                    'IBR': round(ibr, 3),
-                    'Volatility': round(volatility, 2),
-                    'ADX': round(adx, 2)
-                })
-
-        except Exception as e:
-            continue
+    if scan_bars is None:
+        fetched = dict(scan_universe(
+            partial(fetch_scan_bars, min_bars=HFT_SHORT_MIN_BARS, price_cache=price_cache), ticker_list
+        ))
+    else:
+        fetched = scan_bars_tails(scan_bars, ticker_list, HFT_SHORT_MIN_BARS)
+
+    # Screen on price, volume and trend first, so ATR/ADX only run for the symbols that can still qualify
+    screen = last_bar_table(fetched, HFT_SHORT_SCREEN_INDICATORS, indicator_pool)
+    screen_mask = (
+        (screen['c'] >= HFT_SHORT_MIN_PRICE)
+        & (screen['c'] <= HFT_SHORT_MAX_PRICE)
+        & (screen['v'] >= HFT_SHORT_MIN_VOL)
+        & (screen['c'] > screen['ma'])
+    )
+    table = join_indicators(screen[screen_mask], fetched, HFT_SHORT_INDICATORS, indicator_pool)
+
+    # Calculate IBR (Intrabar Range); a zero-range bar gives a NaN/inf IBR, which fails the IBR check as before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['ibr'] = ind.IBR(table['h'], table['l'], table['c'])
+
+    # Remaining entry conditions (the screen checked price, volume and trend): ADX > 35, IBR > 0.7 (closed near high)
+    entry_mask = (
+        (table['adx'] > HFT_SHORT_ADX_LIMIT)
+        & (table['ibr'] > HFT_SHORT_IBR_LIMIT)
+    )
+    entries = table[entry_mask]
+    entry_limits = entries['h'] + HFT_SHORT_STRETCH * entries['atr']
+    capital_per_pos = usable_capital * HFT_ALLOCATION_SHORT / HFT_SHORT_MAX_POS
+    hft_short_list = [
+        {
+            'Symbol': symbol,
+            'Quantity': int(capital_per_pos / entry_limit),
+            'EntryLimit': entry_limit,
+            'IBR': ibr,
+            'Volatility': volatility,
+            'ADX': adx,
+        }
+        for symbol, entry_limit, ibr, volatility, adx in zip(
+            entries.index, entry_limits, entries['ibr'].round(3),
+            (entries['atr'] / entries['c'] * 100).round(2), entries['adx'].round(2),
+        )
+    ]
 
     print(f"Qualified symbols: {len(hft_short_list)}")
 
-    # Sort by IBR (highest first - closed nearest to high)
-    hft_short_list.sort(key=lambda x: x['IBR'], reverse=True)
-
-    # Take top positions up to max
-    entry_candidates = hft_short_list[:HFT_SHORT_MAX_POS]
+    # Take top positions up to max, by IBR (highest first - closed nearest to high)
+    entry_candidates = top_ranked(hft_short_list, 'IBR', HFT_SHORT_MAX_POS)
     entry_symbols = [x['Symbol'] for x in entry_candidates]
 
     print(f"Top {min(len(entry_candidates), HFT_SHORT_MAX_POS)} short candidates: {entry_symbols[:5]}...")
@@ -1219,6 +1409,81 @@ def run_hft_short_strategy(usable_capital, current_positions_df):
 # MAIN EXECUTION
 # ============================================================================
 
+class ThreadCapturedStdout:
+    """
+    Stand-in for sys.stdout that sends a thread's writes to its own buffer while it is capturing, and every other
+    write to the real stream.
+
+    redirect_stdout swaps the one process-wide stream, so it cannot keep the logs of concurrently running strategies
+    apart; this routes by thread instead.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        return getattr(self._local, 'buffer', self.stream).write(text)
+
+    def flush(self):
+        getattr(self._local, 'buffer', self.stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self):
+        """Buffer the calling thread's output for the duration of the block, yielding the buffer."""
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            del self._local.buffer
+
+
+def run_strategy(stdout, name, strategy, *args):
+    """
+    Run one strategy with its progress output captured in a buffer of its own.
+
+    Returns:
+        tuple: (the strategy's orders, or an empty list if it raised; the strategy's log, including any error and
+        traceback)
+    """
+    with stdout.capture() as log_buf:
+        try:
+            orders = strategy(*args)
+        except Exception as e:
+            print(f"\nERROR in {name} strategy: {e}")
+            traceback.print_exc(file=log_buf)
+            orders = []
+    return orders, log_buf.getvalue()
+
+
+def run_strategies(jobs):
+    """
+    Run (name, strategy, args) jobs concurrently, writing each strategy's log in one piece, in job order.
+
+    The strategies only read the shared price caches, and the indicator kernels release the GIL, so their scans
+    overlap rather than queueing behind one another.
+
+    Returns:
+        list: Every strategy's orders, in job order.
+    """
+    stdout = ThreadCapturedStdout(sys.stdout)
+    sys.stdout = stdout
+    all_orders = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(run_strategy, stdout, name, strategy, *args) for name, strategy, args in jobs]
+            for future in futures:
+                orders, log = future.result()
+                stdout.stream.write(log)
+                all_orders.extend(orders)
+    finally:
+        sys.stdout = stdout.stream
+    return all_orders
+
+
 def main():
     """Main execution function."""
 
@@ -1228,6 +1493,9 @@ def main():
     print(f"Run Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
 
+    # Fetches memoized by an earlier run in this process may predate the latest Norgate update
+    du.clear_data_cache()
+
     # Step 1: Initialize IB Trading App API Client
     print("Step 1: Initializing IB Trading App API Client...")
     print("-" * 80)
@@ -1263,88 +1531,105 @@ def main():
         print(f"ERROR: Failed to fetch account data: {e}")
         sys.exit(1)
 
-    # Extract account information - handle both nested and flat structures
-    if 'account' in account_summary and isinstance(account_summary['account'], dict):
-        # Nested structure (actual API response)
-        acct = account_summary['account']
-        account_number = acct.get('account', 'Unknown')
-        equity = acct.get('equity', 0)
-        buying_power = acct.get('buyingPower', 0)
-        net_liquidation = acct.get('netLiquidation', equity)
-        cash = acct.get('cash', 0)
-    else:
-        # Flat structure (as per docs)
-        account_number = account_summary.get('account', 'Unknown')
-        equity = account_summary.get('equity', 0)
-        buying_power = account_summary.get('buying_power', 0)
-        net_liquidation = account_summary.get('net_liquidation', equity)
-        cash = account_summary.get('cash', 0)
-
-    print(f"Account: {account_number}")
-    print(f"Equity: ${equity:,.2f}")
-    print(f"Net Liquidation: ${net_liquidation:,.2f}")
-    print(f"Buying Power: ${buying_power:,.2f}")
-    print(f"Cash: ${cash:,.2f}")
-
-    # Calculate usable capital (using buying power as the primary metric)
-    # For a margin account, buying_power already includes leverage capability
-    usable_capital = (1 - BUFFER) * buying_power
-
-    print(f"Usable Capital (after {BUFFER*100}% buffer): ${usable_capital:,.2f}")
-    print()
-
-    # Step 3: Fetch Current Positions and Open Trades
-    print("Step 3: Fetching Current Positions and Open Trades...")
-    print("-" * 80)
+    # The Norgate freshness check (Step 4) does not depend on the IB API, so it runs while the rest of Steps 2-3 talk
+    # to IB, and the indicator kernels are compiled (or loaded from numba's cache) in the same window. Both start only
+    # once the account call has succeeded, so a failed IB connection still exits straight away.
+    startup_pool = ThreadPoolExecutor(max_workers=3)
+    data_check = startup_pool.submit(du.is_data_up_to_date_v2)
+    kernel_warmup = startup_pool.submit(ind.warmup)
 
     try:
-        # Get portfolio snapshot for comprehensive view
-        portfolio = client.get_portfolio_snapshot(account=account_number)
-        positions_list = portfolio.get('positions', [])
+        # Extract account information - handle both nested and flat structures
+        if 'account' in account_summary and isinstance(account_summary['account'], dict):
+            # Nested structure (actual API response)
+            acct = account_summary['account']
+            account_number = acct.get('account', 'Unknown')
+            equity = acct.get('equity', 0)
+            buying_power = acct.get('buyingPower', 0)
+            net_liquidation = acct.get('netLiquidation', equity)
+            cash = acct.get('cash', 0)
+        else:
+            # Flat structure (as per docs)
+            account_number = account_summary.get('account', 'Unknown')
+            equity = account_summary.get('equity', 0)
+            buying_power = account_summary.get('buying_power', 0)
+            net_liquidation = account_summary.get('net_liquidation', equity)
+            cash = account_summary.get('cash', 0)
+
+        print(f"Account: {account_number}")
+        print(f"Equity: ${equity:,.2f}")
+        print(f"Net Liquidation: ${net_liquidation:,.2f}")
+        print(f"Buying Power: ${buying_power:,.2f}")
+        print(f"Cash: ${cash:,.2f}")
+
+        # Calculate usable capital (using buying power as the primary metric)
+        # For a margin account, buying_power already includes leverage capability
+        usable_capital = (1 - BUFFER) * buying_power
+
+        print(f"Usable Capital (after {BUFFER*100}% buffer): ${usable_capital:,.2f}")
+        print()
+
+        # Step 3: Fetch Current Positions and Open Trades
+        print("Step 3: Fetching Current Positions and Open Trades...")
+        print("-" * 80)
+
+        try:
+            # Get portfolio snapshot for comprehensive view, concurrently with the open trades
+            portfolio_request = startup_pool.submit(client.get_portfolio_snapshot, account=account_number)
+
+            # Get open trades with strategy information
+            open_trades = client.get_open_trades(account=account_number)
+            positions_list = portfolio_request.result().get('positions', [])
 
-        # Get open trades with strategy information
-        open_trades = client.get_open_trades(account=account_number)
+            print(f"Total open positions: {len(positions_list)}")
+            print(f"Total open trades: {len(open_trades)}")
 
-        print(f"Total open positions: {len(positions_list)}")
-        print(f"Total open trades: {len(open_trades)}")
+            # Display current positions by strategy
+            if open_trades:
+                print("\nCurrent positions by strategy:")
+                strategy_counts = {}
+                for trade in open_trades:
+                    strategy_name = trade.get('strategy_name', 'Unknown')
+                    strategy_counts[strategy_name] = strategy_counts.get(strategy_name, 0) + 1
 
-        # Display current positions by strategy
-        if open_trades:
-            print("\nCurrent positions by strategy:")
-            strategy_counts = {}
+                for strategy, count in sorted(strategy_counts.items()):
+                    print(f"  {strategy}: {count} position(s)")
+
+            # Convert open trades to positions_by_strategy dict for compatibility
+            positions_by_strategy = {}
             for trade in open_trades:
                 strategy_name = trade.get('strategy_name', 'Unknown')
-                strategy_counts[strategy_name] = strategy_counts.get(strategy_name, 0) + 1
-
-            for strategy, count in sorted(strategy_counts.items()):
-                print(f"  {strategy}: {count} position(s)")
-
-        # Convert open trades to positions_by_strategy dict for compatibility
-        positions_by_strategy = {}
-        for trade in open_trades:
-            strategy_name = trade.get('strategy_name', 'Unknown')
-            if strategy_name not in positions_by_strategy:
-                positions_by_strategy[strategy_name] = []
-            positions_by_strategy[strategy_name].append({
-                'symbol': trade.get('symbol'),
-                'quantity': trade.get('current_quantity'),
-                'avg_entry_price': trade.get('avg_entry_price'),
-                'unrealized_pnl': trade.get('unrealized_pnl', 0)
-            })
-    except Exception as e:
-        print(f"Warning: Could not fetch positions: {e}")
-        positions_list = []
-        open_trades = []
-        positions_by_strategy = {}
+                if strategy_name not in positions_by_strategy:
+                    positions_by_strategy[strategy_name] = []
+                positions_by_strategy[strategy_name].append({
+                    'symbol': trade.get('symbol'),
+                    'quantity': trade.get('current_quantity'),
+                    'avg_entry_price': trade.get('avg_entry_price'),
+                    'unrealized_pnl': trade.get('unrealized_pnl', 0)
+                })
+        except Exception as e:
+            print(f"Warning: Could not fetch positions: {e}")
+            positions_list = []
+            open_trades = []
+            positions_by_strategy = {}
 
-    print()
+        print()
 
-    # Step 4: Validate Data
-    print("Step 4: Validating Market Data...")
-    print("-" * 80)
+        # Step 4: Validate Data
+        print("Step 4: Validating Market Data...")
+        print("-" * 80)
 
-    # Check if Norgate data is up to date
-    data_ok, norgate_date, expected_date = du.is_data_up_to_date_v2()
+        # Check if Norgate data is up to date
+        data_ok, norgate_date, expected_date = data_check.result()
+        try:
+            kernel_warmup.result()
+        except Exception as e:
+            # Only an optimisation; the kernels still compile on first use
+            print(f"Warning: Indicator kernel warmup failed: {e}")
+    finally:
+        # Also runs if a later step raises: queued requests are cancelled, though interpreter exit still waits for a
+        # running freshness check or warmup
+        startup_pool.shutdown(wait=False, cancel_futures=True)
     if not data_ok:
         print(f"WARNING: Norgate data may be stale. Norgate: {norgate_date}, Expected: {expected_date}")
     else:
@@ -1353,84 +1638,69 @@ def main():
 
     # Step 5: Prepare positions DataFrame
     # Convert positions list to DataFrame for easier handling
-    if positions_list:
+    if positions_list and any('symbol' in position for position in positions_list):
+        # Build only the two columns the strategies read, rather than every field IB returns
+        positions_df = pd.DataFrame({
+            'Symbol': [position.get('symbol') for position in positions_list],
+            'Quantity': [position.get('position') for position in positions_list],
+        })
+    elif positions_list:
         positions_df = pd.DataFrame(positions_list)
-        # Ensure we have the columns we need
-        if 'symbol' in positions_df.columns:
-            positions_df.rename(columns={'symbol': 'Symbol', 'position': 'Quantity'}, inplace=True)
     else:
         positions_df = pd.DataFrame(columns=['Symbol', 'Quantity'])
 
+    # Prefetch every strategy in one concurrent batch, at the longest lookback needed; S&P 500 is a subset of the
+    # Russell 1000, so each symbol is fetched once rather than once per strategy. MOMO reads month-end data, which is
+    # sliced from the same frames, so the depth also covers the trading days since its data end date.
+    # Recent listings are fetched too and dropped by each scan's length check, which costs less than a first-quoted-date
+    # lookup for every symbol.
+    print("Prefetching market data...")
+    today = datetime.now().date()
+    prefetch_symbols = dict.fromkeys(
+        du.get_watchlist_symbols(MOMO_UNIVERSE)
+        + du.get_watchlist_symbols(MR_UNIVERSE)
+        + du.get_watchlist_symbols(MR_SHORT_UNIVERSE)
+        + du.get_watchlist_symbols(HFT_UNIVERSE)
+        + du.get_watchlist_symbols(HFT_SHORT_UNIVERSE)
+        + GROWTH_SYMBOLS + DEF_SYMBOLS + (BTC_SYMBOL, MOMO_INDEX_SYMBOL)
+        + (tuple(positions_df['Symbol']) if 'Symbol' in positions_df.columns else ())
+    )
+    # Weekdays since the MOMO end date bound the trading days after it
+    momo_bars = MOMO_MIN_BARS + int(np.busday_count(momo_data_end_date(today), today))
+    prefetch_bars = max(momo_bars, MR_MIN_BARS, MR_SHORT_MIN_BARS, HFT_MIN_BARS, HFT_SHORT_MIN_BARS,
+                        GROWTH_MIN_BARS, DEF_MIN_BARS, BTC_MIN_BARS) + 1
+    price_cache = du.getData_many(prefetch_symbols, prefetch_bars, max_workers=SCAN_WORKERS)
+    print(f"Prefetched {len(price_cache)} of {len(prefetch_symbols)} symbols ({prefetch_bars} bars)")
+
     # Step 6: Generate Signals for Each Strategy
     print("\nStep 6: Generating Signals...")
     print("=" * 80)
 
-    all_orders = []
-
-    # Run implemented strategies
-    try:
-        momo_orders = run_momo_strategy(usable_capital, positions_df)
-        all_orders.extend(momo_orders)
-    except Exception as e:
-        print(f"\nERROR in MOMO strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        mr_long_orders = run_mr_long_strategy(usable_capital, positions_df)
-        all_orders.extend(mr_long_orders)
-    except Exception as e:
-        print(f"\nERROR in MR Long strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        hft_long_orders = run_hft_long_strategy(usable_capital, positions_df)
-        all_orders.extend(hft_long_orders)
-    except Exception as e:
-        print(f"\nERROR in HFT Long strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
+    # The MR and HFT scans cover overlapping universes, so their bars are gathered in one shared pass
     try:
-        growth_orders = run_growth_strategy(usable_capital, positions_df)
-        all_orders.extend(growth_orders)
+        scan_bars = fetch_shared_scan_bars(price_cache)
     except Exception as e:
-        print(f"\nERROR in GROWTH strategy: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"\nWarning: Shared scan fetch failed, scanning separately: {e}")
+        scan_bars = None
 
+    # Run implemented strategies concurrently; orders and logs come back in this order. The scans share one
+    # indicator pool (None when the kernels run in-line), so concurrent strategies never start pools of their own.
+    indicator_pool = create_indicator_pool()
     try:
-        def_orders = run_def_strategy(usable_capital, positions_df)
-        all_orders.extend(def_orders)
-    except Exception as e:
-        print(f"\nERROR in DEF strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        btc_orders = run_btc_strategy(usable_capital, positions_df)
-        all_orders.extend(btc_orders)
-    except Exception as e:
-        print(f"\nERROR in BTC strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        mr_short_orders = run_mr_short_strategy(usable_capital, positions_df)
-        all_orders.extend(mr_short_orders)
-    except Exception as e:
-        print(f"\nERROR in MR Short strategy: {e}")
-        import traceback
-        traceback.print_exc()
-
-    try:
-        hft_short_orders = run_hft_short_strategy(usable_capital, positions_df)
-        all_orders.extend(hft_short_orders)
-    except Exception as e:
-        print(f"\nERROR in HFT Short strategy: {e}")
-        import traceback
-        traceback.print_exc()
+        all_orders = run_strategies([
+            ("MOMO", run_momo_strategy, (usable_capital, positions_df, price_cache)),
+            ("MR Long", run_mr_long_strategy, (usable_capital, positions_df, price_cache, scan_bars, indicator_pool)),
+            ("HFT Long", run_hft_long_strategy, (usable_capital, positions_df, price_cache, scan_bars, indicator_pool)),
+            ("GROWTH", run_growth_strategy, (usable_capital, positions_df, price_cache)),
+            ("DEF", run_def_strategy, (usable_capital, positions_df, price_cache)),
+            ("BTC", run_btc_strategy, (usable_capital, positions_df, price_cache)),
+            ("MR Short", run_mr_short_strategy, (usable_capital, positions_df, price_cache, scan_bars, indicator_pool)),
+            ("HFT Short", run_hft_short_strategy,
+             (usable_capital, positions_df, price_cache, scan_bars, indicator_pool)),
+        ])
+    finally:
+        if indicator_pool is not None:
+            indicator_pool.shutdown()
 
     # Step 7: Consolidate and Output CSV
     print()
@@ -1441,22 +1711,23 @@ def main():
         print("No orders generated. All strategies returned empty signals.")
         print("This could be normal if market conditions don't meet entry criteria.")
     else:
-        # Create DataFrame and save to CSV
-        orders_df = pd.DataFrame(all_orders)
-
         # Generate filename with today's date
         today = datetime.now().strftime("%Y-%m-%d")
         output_file = os.path.join(OUTPUT_DIR, f"daily_orders_{today}.csv")
 
-        orders_df.to_csv(output_file, index=False)
+        # Rows are already formatted strings/ints in column order, so write them directly
+        with open(output_file, "w", newline="") as fh:
+            writer = csv.writer(fh, lineterminator=os.linesep)
+            writer.writerow(OrderRow._fields)
+            writer.writerows(all_orders)
 
-        print(f"[OK] Generated {len(orders_df)} total orders")
+        print(f"[OK] Generated {len(all_orders)} total orders")
         print(f"[OK] Saved to: {output_file}")
         print()
         print("Order Summary by Strategy and Action:")
-        summary = orders_df.groupby(['Strategy', 'Action']).size().reset_index(name='Count')
-        for _, row in summary.iterrows():
-            print(f"  {row['Strategy']:15s} {row['Action']:12s} {row['Count']:3d} orders")
+        summary = Counter((order.Strategy, order.Action) for order in all_orders)
+        for (strategy, action), count in sorted(summary.items()):
+            print(f"  {strategy:15s} {action:12s} {count:3d} orders")
         print()
         print("Next Steps:")
         print("  1. Review the CSV file")
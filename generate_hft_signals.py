@@ -13,49 +13,35 @@ Strategy Logic:
 Orders automatically close at market close if filled (AttachMOC=YES).
 """
 
+import csv
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import pandas as pd
+import numpy as np
 import pytz
 
-import norgatedata
-import ta
+from utils import indicator_utils as ind
+from utils import data_utils as du
 
-# Norgate Data Configuration
-timeseriesformat = 'pandas-dataframe'
-priceadjust = norgatedata.StockPriceAdjustmentType.CAPITAL
-padding_setting = norgatedata.PaddingType.NONE
+# Worker threads for the universe scan fetches
+SCAN_WORKERS = 16
 
-
-# Utility functions (inlined from oldSignalGenCode)
-def getData(symbol, bars=250):
-    """Fetches price data for a given symbol and number of bars."""
-    return norgatedata.price_timeseries(
-        symbol,
-        stock_price_adjustment_setting=priceadjust,
-        padding_setting=padding_setting,
-        limit=bars,
-        timeseriesformat=timeseriesformat,
-    )
+# Columns of the batch order CSV, in output order
+ORDER_FIELDS = (
+    'Symbol', 'Action', 'Quantity', 'OrderType', 'LimitPrice', 'StopPrice', 'SecurityType', 'Exchange', 'Timezone',
+    'TimeInForce', 'GoodTillDate', 'AttachMOC', 'Strategy', 'OutsideRTH', 'AllOrNone', 'Hidden', 'DisplaySize',
+    'DisplaySizeIsPercentage',
+)
 
 
+# Utility functions (inlined from oldSignalGenCode)
 def IBR(H, L, C):
     """Calculate Internal Bar Range: (Close - Low) / (High - Low)"""
     ans = (C - L) / (H - L)
     return ans
 
 
-def tickSize(l):
-    """Determine appropriate tick size based on price level."""
-    tick = 0.01
-    if l < 2:
-        tick = 0.005
-    if l < 0.1:
-        tick = 0.001
-    return tick
-
-
 class HFTSignalGenerator:
     """Generate HFT trading signals from Russell 1000 stocks."""
 
@@ -95,139 +81,106 @@ class HFTSignalGenerator:
         print(f"Using equity: ${self.equity:,.2f}")
         return self.equity
 
-    def calculate_indicators(self, data):
-        """Calculate technical indicators for a stock."""
-        if len(data) < self.min_bars:
-            return None
-
-        # Latest bar values
-        close = data.Close.iloc[-1]
-        high = data.High.iloc[-1]
-        low = data.Low.iloc[-1]
-
-        # Moving average
-        ma = ta.trend.SMAIndicator(
-            data.Close, self.ma_period, fillna=True
-        ).sma_indicator().iloc[-1]
-
-        # ADX
-        adx = ta.trend.ADXIndicator(
-            data.High, data.Low, data.Close, self.adx_period, fillna=True
-        ).adx().iloc[-1]
-
-        # ATR
-        atr = ta.volatility.AverageTrueRange(
-            data.High, data.Low, data.Close, self.atr_period, fillna=True
-        ).average_true_range().iloc[-1]
-
-        # Average volume
-        avg_volume = ta.trend.EMAIndicator(
-            data.Volume, self.volume_period, fillna=True
-        ).ema_indicator().iloc[-1]
-
-        # IBR (Internal Bar Range)
-        ibr = IBR(high, low, close)
-
-        # Volatility %
-        volatility = (atr / close * 100) if close > 0 else 0
-
-        return {
-            'close': close,
-            'high': high,
-            'low': low,
-            'ma': ma,
-            'adx': adx,
-            'atr': atr,
-            'avg_volume': avg_volume,
-            'ibr': ibr,
-            'volatility': volatility
-        }
-
-    def check_long_signal(self, symbol, indicators):
-        """Check if stock meets HFT long criteria."""
-        # Price filter
-        if indicators['close'] < self.long_min_price or indicators['close'] > self.long_max_price:
-            return None
-
-        # Volume filter
-        if indicators['avg_volume'] < self.min_volume:
-            return None
-
-        # Trend filter: close above MA
-        if indicators['close'] <= indicators['ma']:
-            return None
-
-        # Momentum filter: ADX > threshold
-        if indicators['adx'] <= self.adx_threshold:
-            return None
-
-        # Mean reversion setup: IBR < threshold (closed near low)
-        if indicators['ibr'] >= self.long_ibr_max:
-            return None
-
-        # Calculate limit price: Low - 0.6*ATR
-        tick = tickSize(indicators['low'])
-        entry_limit = round((indicators['low'] - self.long_stretch * indicators['atr']) / tick) * tick
-
-        # Calculate position size
-        position_value = self.equity * self.leverage * self.long_allocation / self.max_positions
-        quantity = max(1, int(position_value / entry_limit))
-
-        return {
-            'symbol': symbol,
-            'action': 'BUY',
-            'quantity': quantity,
-            'limit_price': entry_limit,
-            'volatility': indicators['volatility'],
-            'ibr': indicators['ibr'],
-            'adx': indicators['adx']
-        }
-
-    def check_short_signal(self, symbol, indicators):
-        """Check if stock meets HFT short criteria."""
-        # Price filter
-        if indicators['close'] < self.short_min_price or indicators['close'] > self.short_max_price:
-            return None
-
-        # Volume filter
-        if indicators['avg_volume'] < self.min_volume:
-            return None
-
-        # Trend filter: close above MA
-        if indicators['close'] <= indicators['ma']:
-            return None
-
-        # Momentum filter: ADX > threshold
-        if indicators['adx'] <= self.adx_threshold:
+    def calculate_indicators(self, fetched):
+        """
+        Calculate technical indicators for every fetched stock, panel-wise (see du.last_bar_table).
+
+        Returns:
+            pd.DataFrame: One row per symbol, in the order of fetched.
+        """
+        # Latest bar values plus moving average, ADX, ATR and average volume
+        indicators = du.last_bar_table(fetched, {
+            'ma': ('sma', self.ma_period),
+            'adx': ('adx', self.adx_period),
+            'atr': ('atr', self.atr_period),
+            'avg_volume': ('volume_ema', self.volume_period),
+        })
+
+        # IBR (Internal Bar Range) and volatility %; a zero-range bar gives a NaN/inf IBR as before
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indicators['ibr'] = IBR(indicators['h'], indicators['l'], indicators['c'])
+            indicators['volatility'] = np.where(indicators['c'] > 0, indicators['atr'] / indicators['c'] * 100, 0)
+
+        return indicators
+
+    def _signals(self, entries, action, prices, stretch, allocation):
+        """Signal dicts for the entries, with tick-rounded limits at prices + stretch * ATR and sized positions."""
+        tick = ind.tickSize_array(prices)
+        entry_limits = np.round((prices + stretch * entries['atr']) / tick) * tick
+        position_value = self.equity * self.leverage * allocation / self.max_positions
+        return [
+            {
+                'symbol': symbol,
+                'action': action,
+                'quantity': max(1, int(position_value / entry_limit)),
+                'limit_price': entry_limit,
+                'volatility': volatility,
+                'ibr': ibr,
+                'adx': adx
+            }
+            for symbol, entry_limit, volatility, ibr, adx in zip(
+                entries.index, entry_limits, entries['volatility'], entries['ibr'], entries['adx']
+            )
+            # A zero limit cannot be sized
+            if entry_limit != 0
+        ]
+
+    def check_long_signals(self, indicators):
+        """Select the stocks meeting HFT long criteria, in the order of indicators."""
+        rejected = (
+            # Price filter
+            (indicators['c'] < self.long_min_price) | (indicators['c'] > self.long_max_price)
+            # Volume filter
+            | (indicators['avg_volume'] < self.min_volume)
+            # Trend filter: close above MA
+            | (indicators['c'] <= indicators['ma'])
+            # Momentum filter: ADX > threshold
+            | (indicators['adx'] <= self.adx_threshold)
+            # Mean reversion setup: IBR < threshold (closed near low)
+            | (indicators['ibr'] >= self.long_ibr_max)
+        )
+        entries = indicators[~rejected]
+
+        # Limit price: Low - 0.6*ATR
+        return self._signals(entries, 'BUY', entries['l'], -self.long_stretch, self.long_allocation)
+
+    def check_short_signals(self, indicators):
+        """Select the stocks meeting HFT short criteria, in the order of indicators."""
+        rejected = (
+            # Price filter
+            (indicators['c'] < self.short_min_price) | (indicators['c'] > self.short_max_price)
+            # Volume filter
+            | (indicators['avg_volume'] < self.min_volume)
+            # Trend filter: close above MA
+            | (indicators['c'] <= indicators['ma'])
+            # Momentum filter: ADX > threshold
+            | (indicators['adx'] <= self.adx_threshold)
+            # Mean reversion setup: IBR > threshold (closed near high)
+            | (indicators['ibr'] <= self.short_ibr_min)
+        )
+        entries = indicators[~rejected]
+
+        # Limit price: High + 0.3*ATR
+        return self._signals(entries, 'SELL', entries['h'], self.short_stretch, self.short_allocation)
+
+    def scan_symbol(self, symbol):
+        """Fetch one symbol's bars as numpy arrays; None if the fetch failed or returned fewer than min_bars bars."""
+        try:
+            bars = du.getBarData(symbol, self.min_bars)
+        except Exception as e:
+            # Skip symbols with data errors
             return None
-
-        # Mean reversion setup: IBR > threshold (closed near high)
-        if indicators['ibr'] <= self.short_ibr_min:
+        if len(bars.close) < self.min_bars:
             return None
-
-        # Calculate limit price: High + 0.3*ATR
-        tick = tickSize(indicators['high'])
-        entry_limit = round((indicators['high'] + self.short_stretch * indicators['atr']) / tick) * tick
-
-        # Calculate position size
-        position_value = self.equity * self.leverage * self.short_allocation / self.max_positions
-        quantity = max(1, int(position_value / entry_limit))
-
-        return {
-            'symbol': symbol,
-            'action': 'SELL',
-            'quantity': quantity,
-            'limit_price': entry_limit,
-            'volatility': indicators['volatility'],
-            'ibr': indicators['ibr'],
-            'adx': indicators['adx']
-        }
+        return bars
 
     def scan_universe(self):
         """Scan Russell 1000 for HFT signals."""
+        # Fetches memoized by an earlier scan in this process may predate the latest Norgate update
+        du.clear_data_cache()
         print("Fetching Russell 1000 watchlist...")
         try:
-            ticker_list = norgatedata.watchlist_symbols('Russell 1000')
+            ticker_list = du.get_watchlist_symbols('Russell 1000')
             # Exclude GOOG as in original code
             ticker_list = [t for t in ticker_list if t != 'GOOG']
             print(f"Scanning {len(ticker_list)} symbols...")
@@ -235,54 +188,38 @@ class HFTSignalGenerator:
             print(f"Error fetching watchlist: {e}")
             return [], []
 
-        long_candidates = []
-        short_candidates = []
-
-        for i, symbol in enumerate(ticker_list):
-            if (i + 1) % 100 == 0:
-                print(f"Processed {i + 1}/{len(ticker_list)} symbols...")
-
-            try:
-                # Fetch data
-                data = getData(symbol, self.min_bars)
+        # Fetch concurrently; map yields results in ticker order, so candidates keep the same order as a serial scan
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            for i, (symbol, bars) in enumerate(zip(ticker_list, executor.map(self.scan_symbol, ticker_list))):
+                if (i + 1) % 100 == 0:
+                    print(f"Processed {i + 1}/{len(ticker_list)} symbols...")
+                if bars is not None:
+                    fetched[symbol] = bars
 
-                if data is None or len(data) < self.min_bars:
-                    continue
-
-                # Calculate indicators
-                indicators = self.calculate_indicators(data)
-                if indicators is None:
-                    continue
-
-                # Check for long signal
-                long_signal = self.check_long_signal(symbol, indicators)
-                if long_signal:
-                    long_candidates.append(long_signal)
-
-                # Check for short signal
-                short_signal = self.check_short_signal(symbol, indicators)
-                if short_signal:
-                    short_candidates.append(short_signal)
-
-            except Exception as e:
-                # Skip symbols with data errors
-                continue
+        # Calculate indicators and check signals for the whole universe at once
+        indicators = self.calculate_indicators(fetched)
+        long_candidates = self.check_long_signals(indicators)
+        short_candidates = self.check_short_signals(indicators)
 
         print(f"\nFound {len(long_candidates)} long candidates, {len(short_candidates)} short candidates")
 
-        # Rank by volatility and select top 15
-        long_candidates.sort(key=lambda x: x['volatility'], reverse=True)
-        short_candidates.sort(key=lambda x: x['volatility'], reverse=True)
-
-        long_signals = long_candidates[:self.max_positions]
-        short_signals = short_candidates[:self.max_positions]
+        # Rank by volatility and select top 15; partitions rather than sorting every candidate, ties keep ticker order
+        long_signals = [
+            long_candidates[i]
+            for i in ind.top_n_indices([x['volatility'] for x in long_candidates], self.max_positions)
+        ]
+        short_signals = [
+            short_candidates[i]
+            for i in ind.top_n_indices([x['volatility'] for x in short_candidates], self.max_positions)
+        ]
 
         print(f"Selected top {len(long_signals)} long signals, {len(short_signals)} short signals")
 
         return long_signals, short_signals
 
     def generate_csv(self, long_signals, short_signals, output_file):
-        """Generate CSV file for batch order upload."""
+        """Generate CSV file for batch order upload, returning the order rows written."""
         # Ensure output directory exists
         output_dir = os.path.dirname(output_file)
         if output_dir and not os.path.exists(output_dir):
@@ -299,56 +236,40 @@ class HFTSignalGenerator:
 
         gtd_string = expiration_time.strftime('%Y-%m-%dT%H:%M')
 
-        # Prepare rows
-        rows = []
-
-        for signal in long_signals:
-            rows.append({
-                'Symbol': signal['symbol'],
-                'Action': signal['action'],
-                'Quantity': signal['quantity'],
-                'OrderType': 'LIMIT',
-                'LimitPrice': f"{signal['limit_price']:.2f}",
-                'StopPrice': '',
-                'SecurityType': 'CFD',
-                'Exchange': 'SMART',
-                'Timezone': '',
-                'TimeInForce': 'GTD',
-                'GoodTillDate': gtd_string,
-                'AttachMOC': 'YES',
-                'Strategy': 'hft-long',
-                'OutsideRTH': 'NO',
-                'AllOrNone': 'NO',
-                'Hidden': 'NO',
-                'DisplaySize': '0',
-                'DisplaySizeIsPercentage': 'NO'
-            })
-
-        for signal in short_signals:
-            rows.append({
+        # Fields shared by every order
+        shared_fields = {
+            'OrderType': 'LIMIT',
+            'StopPrice': '',
+            'SecurityType': 'CFD',
+            'Exchange': 'SMART',
+            'Timezone': '',
+            'TimeInForce': 'GTD',
+            'GoodTillDate': gtd_string,
+            'AttachMOC': 'YES',
+            'OutsideRTH': 'NO',
+            'AllOrNone': 'NO',
+            'Hidden': 'NO',
+            'DisplaySize': '0',
+            'DisplaySizeIsPercentage': 'NO'
+        }
+        rows = [
+            {
                 'Symbol': signal['symbol'],
                 'Action': signal['action'],
                 'Quantity': signal['quantity'],
-                'OrderType': 'LIMIT',
                 'LimitPrice': f"{signal['limit_price']:.2f}",
-                'StopPrice': '',
-                'SecurityType': 'CFD',
-                'Exchange': 'SMART',
-                'Timezone': '',
-                'TimeInForce': 'GTD',
-                'GoodTillDate': gtd_string,
-                'AttachMOC': 'YES',
-                'Strategy': 'hft-short',
-                'OutsideRTH': 'NO',
-                'AllOrNone': 'NO',
-                'Hidden': 'NO',
-                'DisplaySize': '0',
-                'DisplaySizeIsPercentage': 'NO'
-            })
-
-        # Create DataFrame and save
-        df = pd.DataFrame(rows)
-        df.to_csv(output_file, index=False)
+                'Strategy': strategy,
+                **shared_fields
+            }
+            for strategy, signals in (('hft-long', long_signals), ('hft-short', short_signals))
+            for signal in signals
+        ]
+
+        # Write the rows straight to CSV
+        with open(output_file, 'w', newline='') as fh:
+            writer = csv.DictWriter(fh, fieldnames=ORDER_FIELDS, lineterminator=os.linesep)
+            writer.writeheader()
+            writer.writerows(rows)
 
         print(f"\n[SUCCESS] CSV file created: {output_file}")
         print(f"  Total orders: {len(rows)}")
@@ -356,7 +277,7 @@ class HFTSignalGenerator:
         print(f"  Short orders: {len(short_signals)}")
         print(f"  Expiration: {gtd_string} ET")
 
-        return df
+        return rows
 
     def print_summary(self, long_signals, short_signals):
         """Print summary of generated signals."""
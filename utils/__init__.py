@@ -2,7 +2,7 @@
 Utils Package
 
 Common utilities for trading signal generation including:
-- indicator_utils: Technical indicators (IBR, ROC, tickSize)
+- indicator_utils: Technical indicators (IBR, ROC, tickSize, last-value SMA/RSI/ATR/ADX)
 - api_utils: API interaction functions
 - data_utils: Market data fetching and validation
 - email_utils: Email reporting (legacy, not currently used)
@@ -127,6 +127,19 @@ def fetch_account_info(accountID, isLive, headers):
 
     return account_data
 
+def _parse_quantity(value, symbol=None):
+    """
+    Parse an API quantity (string or number): an int when integral, otherwise a float.
+
+    Malformed values are reported and come back as NaN, as the pd.to_numeric(errors="coerce") pass they replace gave.
+    """
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        print(f"Warning: Malformed quantity {value!r} for {symbol}")
+        return float('nan')
+    return int(quantity) if quantity.is_integer() else quantity
+
 def fetch_open_positions(isLive, headers):
     """
     Fetch open positions from the API and process them into a list of trade records.
@@ -136,7 +149,7 @@ def fetch_open_positions(isLive, headers):
         headers (dict): The headers for the API request, including authentication.
 
     Returns:
-        list: A list of processed trade records.
+        list: A list of processed trade records, with numeric Quantity and Execution Price fields.
     """
  
     if isLive == False:  # Hardcoding workaround
@@ -167,7 +180,7 @@ def fetch_open_positions(isLive, headers):
                 "Order Quantity": trade['quantity'],
                 "Limit Price": trade.get('limitPrice', None),
                 "Commission Fee": float(entry_order.get('commissionFee', 0)),  # Default to 0 if missing
-                "Quantity": entry_order.get('execQuantity', 0),  # Default to 0 if missing
+                "Quantity": _parse_quantity(entry_order.get('execQuantity', 0), trade['symbol']),  # 0 if missing
                 "Execution Price": float(entry_order.get('executionPrice', 0)),  # Default to 0 if missing
                 "Opened DateTime": entry_order.get('openedDateTime', None),  # Default to None if missing
             }
@@ -178,6 +191,14 @@ def fetch_open_positions(isLive, headers):
         print(f"Error fetching open positions: {e}")
         return []
     
+def _signal_records(signals):
+    """Signals as a list of JSON-ready dicts, from a DataFrame or from a list of record dicts."""
+    if hasattr(signals, 'to_dict'):
+        return signals.to_dict(orient='records')
+    # numpy scalars (e.g. quantities read from a DataFrame row) are not JSON serialisable
+    return [{key: value.item() if hasattr(value, 'item') else value for key, value in record.items()}
+            for record in signals]
+
 def send_signals_to_mongo(strategy_name, strategy_type, signals_df, strategy_id, is_live, api_key, spy_date, spy_date_name):
     """
     Send trading signals to MongoDB.
@@ -185,7 +206,7 @@ def send_signals_to_mongo(strategy_name, strategy_type, signals_df, strategy_id,
     Parameters:
         strategy_name (str): The name of the strategy.
         strategy_type (str): The type of the strategy (e.g., 'ROT', 'MR', 'HFT').
-        signals_df (pd.DataFrame): The signals to be sent.
+        signals_df (pd.DataFrame or list of dict): The signals to be sent.
         strategy_id (str): The MongoDB strategy ID.
         is_live(bool): Is the strategy a demo or live.
         api_key (str): The API key for authentication.
@@ -204,7 +225,7 @@ def send_signals_to_mongo(strategy_name, strategy_type, signals_df, strategy_id,
         'type': strategy_type,
         'lastTradeDay': spy_date_name,
         'lastTradeDate': str(spy_date_num),
-        'signals': signals_df.to_dict(orient='records'),
+        'signals': _signal_records(signals_df),
     }
     
     # API URL
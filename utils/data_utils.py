@@ -1,15 +1,25 @@
 # data_utils.py
 import datetime as dt
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 import pytz
 import exchange_calendars as mcal
 import norgatedata
 import yfinance as yf
 
+from . import indicator_utils as ind
+
 # Initialize Norgate Data API
 timeseriesformat = 'pandas-dataframe'
 priceadjust = norgatedata.StockPriceAdjustmentType.CAPITAL
 padding_setting = norgatedata.PaddingType.NONE
 
+# Raw numpy price arrays for one symbol plus the date of its last bar
+BarData = namedtuple('BarData', 'close high low volume last_date')
+
 
 def is_data_up_to_date(spy_data):
     """
@@ -23,7 +33,7 @@ def is_data_up_to_date(spy_data):
     """
     
     lastTradeDayDate = mcal.get_calendar('XNYS').previous_close(dt.datetime.now(pytz.timezone('US/Eastern')).date()).date()
-    spyDate = getData('SPY', 2).index[-1].date()
+    spyDate = _price_timeseries('SPY', 2).index[-1].date()
     
     return spyDate == lastTradeDayDate
 
@@ -35,8 +45,8 @@ def is_data_up_to_date_v2():
     Returns:
     tuple: (bool indicating if up-to-date, Norgate's last data date, expected last trade date)
     """
-    # Load latest SPY data (2 days to be safe)
-    spy_data = getData('SPY', 2)
+    # Load latest SPY data (2 days to be safe), uncached so a recheck sees a Norgate update made since the last one
+    spy_data = _price_timeseries('SPY', 2)
     norgate_last_trade_date = spy_data.index[-1].date()
 
     # Get today's date in adelaide time
@@ -58,8 +68,8 @@ def check_norgate_against_yahoo():
     Returns:
     bool: True if the data is up-to-date, False otherwise.
     """
-    # Fetch the last 2 days of data for SPY from Norgate Data
-    spy_data = getData('SPY', 2)
+    # Fetch the last 2 days of data for SPY from Norgate Data (uncached, like is_data_up_to_date_v2)
+    spy_data = _price_timeseries('SPY', 2)
     norgate_last_trade_date = spy_data.index[-1].date()
     # print(f"Norgate last trade date: {norgate_last_trade_date}")
 
@@ -71,32 +81,190 @@ def check_norgate_against_yahoo():
     # Compare the dates
     return norgate_last_trade_date == yahoo_last_trade_date, norgate_last_trade_date, yahoo_last_trade_date
 
-def getData(symbol, bars=250):
-    """Fetches price data for a given symbol and number of bars."""
+def _price_timeseries(symbol, bars, end_date=None):
+    """Fetches price data straight from Norgate, bypassing the memoized fetches."""
+    kwargs = {} if end_date is None else {'end_date': end_date}
     return norgatedata.price_timeseries(
         symbol,
         stock_price_adjustment_setting=priceadjust,
         padding_setting=padding_setting,
         limit=bars,
         timeseriesformat=timeseriesformat,
+        **kwargs,
     )
 
+@lru_cache(maxsize=4096)
+def _getData_cached(symbol, bars, end_date):
+    """
+    Norgate fetch memoized on (symbol, bars, end_date); returned frames are shared and must not be mutated.
+
+    Entries are kept until clear_data_cache(), which each run calls first, so a long-lived session (e.g. re-running
+    cells in an IDE) picks up a Norgate update that landed after its previous run.
+    """
+    return _price_timeseries(symbol, bars, end_date)
+
+def clear_data_cache():
+    """Drops every memoized Norgate price fetch and watchlist, so the next fetches read the latest Norgate data."""
+    _getData_cached.cache_clear()
+    get_watchlist_symbols.cache_clear()
+
+def getData(symbol, bars=250):
+    """Fetches price data for a given symbol and number of bars."""
+    return _getData_cached(symbol, bars, None)
+
 def getData_endDate(symbol, bars, end_date):
     """Fetches price data for a given symbol, bars, and an end date."""
-    return norgatedata.price_timeseries(
-        symbol,
-        stock_price_adjustment_setting=priceadjust,
-        padding_setting=padding_setting,
-        end_date=end_date,
-        limit=bars,
-        timeseriesformat=timeseriesformat,
+    return _getData_cached(symbol, bars, end_date)
+
+def getData_many(symbols, bars=250, end_date=None, max_workers=16):
+    """
+    Fetches price data for many symbols concurrently; Norgate fetches are I/O bound so threads overlap the waits.
+
+    Returns:
+    dict: {symbol: pd.DataFrame} in input order, omitting symbols whose fetch failed.
+    """
+    symbols = list(symbols)
+
+    def _safe_get(symbol):
+        try:
+            return _getData_cached(symbol, bars, end_date)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(_safe_get, symbols))
+    return {symbol: data for symbol, data in zip(symbols, frames) if data is not None}
+
+def getData_prefetched(prefetched, symbol, bars):
+    """
+    Last bars of a symbol's prefetched frame, falling back to getData when it was not prefetched.
+
+    Norgate's limit returns the most recent bars, so the tail of a longer fetch is the same data as fetching bars directly.
+    """
+    data = prefetched.get(symbol) if prefetched else None
+    if data is None:
+        return getData(symbol, bars)
+    return data.tail(bars)
+
+def getData_endDate_prefetched(prefetched, symbol, bars, end_date):
+    """
+    Last bars up to end_date from a symbol's prefetched frame, falling back to getData_endDate when it was not
+    prefetched or the prefetch does not reach far enough back.
+
+    A fetch with end_date returns the most recent bars on or before it, so slicing a deeper latest-bars fetch at
+    end_date gives the same data.
+    """
+    data = prefetched.get(symbol) if prefetched else None
+    if data is not None:
+        data = data.iloc[:data.index.searchsorted(np.datetime64(end_date, 'D'), side='right')]
+        if len(data) >= bars:
+            return data.tail(bars)
+    return getData_endDate(symbol, bars, end_date)
+
+def getBarData(symbol, bars=250, end_date=None):
+    """Fetches price data for a given symbol as a BarData of numpy arrays, for scans that only need raw values."""
+    data = _getData_cached(symbol, bars, end_date)
+    return BarData(
+        data.Close.values,
+        data.High.values,
+        data.Low.values,
+        data.Volume.values,
+        data.index[-1] if len(data) else None,
     )
 
+def tail_bars(bars, count):
+    """Last count bars of a BarData, identical to fetching count bars directly."""
+    return BarData(bars.close[-count:], bars.high[-count:], bars.low[-count:], bars.volume[-count:], bars.last_date)
+
+def bars_complete(bars):
+    """True if no close, high, low or volume value in the BarData is missing."""
+    return not (np.isnan(bars.close).any() or np.isnan(bars.high).any()
+                or np.isnan(bars.low).any() or np.isnan(bars.volume).any())
+
+def stack_bar_panels(bar_data):
+    """
+    Groups a {symbol: BarData} dict by history length and stacks each group into a 2-D panel.
+
+    Histories are never padded or trimmed, so recursive indicators computed on a panel match the per-symbol result.
+
+    Yields:
+    tuple: (list of symbols, BarData of (symbols x bars) arrays with one last_date per symbol)
+    """
+    groups = {}
+    for symbol, bars in bar_data.items():
+        groups.setdefault(len(bars.close), []).append(symbol)
+    for symbols in groups.values():
+        yield symbols, BarData(
+            np.vstack([bar_data[s].close for s in symbols]),
+            np.vstack([bar_data[s].high for s in symbols]),
+            np.vstack([bar_data[s].low for s in symbols]),
+            np.vstack([bar_data[s].volume for s in symbols]),
+            [bar_data[s].last_date for s in symbols],
+        )
+
+def last_bar_table(bar_data, indicator_spec, panel_indicators=None):
+    """
+    Last-bar close/high/low/volume plus the indicators in indicator_spec for every symbol in a {symbol: BarData} dict.
+
+    Symbols are stacked into panels with stack_bar_panels, so each indicator is one indicator_utils.last_bar_panel call
+    per panel rather than one per symbol. panel_indicators(panel, indicator_spec), when given, stands in for that call
+    (e.g. to split a panel's rows across processes).
+
+    Returns:
+    pd.DataFrame: Columns c, h, l, v and the indicator_spec names, indexed by symbol in the order of bar_data.
+    """
+    frames = []
+    for symbols, panel in stack_bar_panels(bar_data):
+        if panel_indicators is None:
+            indicators = ind.last_bar_panel(panel.high, panel.low, panel.close, panel.volume, indicator_spec)
+        else:
+            indicators = panel_indicators(panel, indicator_spec)
+        frames.append(pd.DataFrame({
+            'c': panel.close[:, -1],
+            'h': panel.high[:, -1],
+            'l': panel.low[:, -1],
+            'v': panel.volume[:, -1],
+            **indicators,
+        }, index=symbols))
+    if not frames:
+        return pd.DataFrame(columns=['c', 'h', 'l', 'v', *indicator_spec], dtype=float)
+    return pd.concat(frames).loc[list(bar_data)]
+
+@lru_cache(maxsize=16)
+def get_watchlist_symbols(watchlist_name):
+    """Fetches the symbols in a Norgate watchlist once per process, as an immutable tuple."""
+    return tuple(norgatedata.watchlist_symbols(watchlist_name))
+
+@lru_cache(maxsize=8192)
+def get_first_quoted_date(symbol):
+    """Fetches a symbol's first quoted date from Norgate once per process, as a numpy day; None if unavailable."""
+    try:
+        first_date = norgatedata.first_quoted_date(symbol)
+    except Exception:
+        return None
+    if first_date is None:
+        return None
+    return np.datetime64(str(first_date)[:10], 'D')
+
+def has_min_history(symbol, min_bars, end_date=None):
+    """
+    False if a symbol was listed too recently to have min_bars daily bars by end_date (default today), without
+    fetching prices.
+
+    Trading days never outnumber weekdays, so a symbol quoted on fewer than min_bars weekdays is certain to fail a
+    min_bars length check. True when the first quoted date is unknown.
+    """
+    first_date = get_first_quoted_date(symbol)
+    if first_date is None:
+        return True
+    return np.busday_count(first_date, np.datetime64(end_date or dt.date.today(), 'D') + 1) >= min_bars
+
 def is_last_friday_of_month(date):
     """Checks if the given date is the last Friday of the month."""
     last_friday = get_last_friday_of_month(date)
     return date == last_friday
 
+@lru_cache(maxsize=32)
 def get_last_friday_of_month(date):
     """Finds the last Friday of the month for a given date."""
     next_month = date.replace(day=28) + dt.timedelta(days=4)  # this will never fail
@@ -106,6 +274,7 @@ def get_last_friday_of_month(date):
         last_friday -= dt.timedelta(days=1)
     return last_friday
 
+@lru_cache(maxsize=32)
 def get_last_friday_of_previous_month(date):
     """Finds the last Friday of the previous month for a given date."""
     first_day_of_current_month = date.replace(day=1)
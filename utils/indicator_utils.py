@@ -1,3 +1,17 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; fall back to plain Python kernels
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
 def IBR(H,L,C):
     ans = (C-L)/(H-L)
     return(ans)
@@ -6,11 +20,282 @@ def ROC(data, p1):
     roc = 100 * ((data.iloc[-1] - data.iloc[-p1 - 1]) / data.iloc[-p1 - 1])
     return round(roc, 2)
 
+def roc_tail(close, period, bars=1):
+    """Percentage rate of change over period for the last bars closes, matching pct_change(period)*100."""
+    close = np.asarray(close, dtype=np.float64)
+    return (close[-bars:] / close[len(close) - bars - period:len(close) - period] - 1) * 100
+
+# Tick size lookup tables: prices below 0.1 -> 0.001, below 2 -> 0.005, otherwise 0.01
+TICK_THRESHOLDS = np.array([0.1, 2.0])
+TICK_SIZES = np.array([0.001, 0.005, 0.01])
+
 def tickSize(l):
-    tick = 0.01
-    if l < 2:
-        tick = 0.005
-    if l < 0.1:
-        tick = 0.001
-    return(tick)
+    tick = TICK_SIZES[np.searchsorted(TICK_THRESHOLDS, l, side='right')]
+    return float(tick)
+
+def tickSize_array(prices):
+    """Tick size for every price in an array, using the same thresholds as tickSize."""
+    return TICK_SIZES[np.searchsorted(TICK_THRESHOLDS, np.asarray(prices, dtype=np.float64), side='right')]
+
+
+# %% Last-value indicators
+# Numpy equivalents of the ta library indicators (fillna=True) that return only the final value.
+# Each helper accepts a 1-D array (one symbol, returns a float) or a 2-D array of shape
+# (symbols, bars) with equal-length rows (returns one value per symbol).
+
+def _as_panel(x):
+    """Return x as a float64 2-D (symbols, bars) array."""
+    return np.atleast_2d(np.asarray(x, dtype=np.float64))
+
+
+def _unpanel(values, like):
+    """Collapse a per-symbol result back to a scalar when the input was 1-D."""
+    return float(values[0]) if np.ndim(like) == 1 else values
+
+
+@njit(cache=True, nogil=True)
+def _ema_kernel(values, n):
+    rows, bars = values.shape
+    alpha = 2.0 / (n + 1)
+    out = np.empty(rows)
+    for r in range(rows):
+        ema = values[r, 0]
+        for i in range(1, bars):
+            ema = ema * (1.0 - alpha) + alpha * values[r, i]
+        out[r] = ema
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _rsi_kernel(close, n):
+    rows, bars = close.shape
+    alpha = 1.0 / n
+    out = np.empty(rows)
+    for r in range(rows):
+        up = 0.0
+        dn = 0.0
+        for i in range(1, bars):
+            diff = close[r, i] - close[r, i - 1]
+            up = up * (1.0 - alpha) + alpha * max(diff, 0.0)
+            dn = dn * (1.0 - alpha) + alpha * max(-diff, 0.0)
+        if dn == 0:
+            out[r] = 100.0
+        else:
+            out[r] = 100.0 - 100.0 / (1.0 + up / dn)
+        if np.isnan(out[r]):
+            out[r] = 50.0
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _true_range_kernel(high, low, close):
+    rows, bars = close.shape
+    tr = np.empty((rows, bars))
+    for r in range(rows):
+        tr[r, 0] = high[r, 0] - low[r, 0]
+        for i in range(1, bars):
+            tr[r, i] = max(high[r, i] - low[r, i], abs(high[r, i] - close[r, i - 1]), abs(low[r, i] - close[r, i - 1]))
+    return tr
+
+
+@njit(cache=True, nogil=True)
+def _atr_kernel(tr, n):
+    rows, bars = tr.shape
+    out = np.empty(rows)
+    for r in range(rows):
+        atr = 0.0
+        for i in range(bars):
+            if i < n:
+                atr += tr[r, i]
+                if i == n - 1:
+                    atr /= n
+            else:
+                atr = (atr * (n - 1) + tr[r, i]) / n
+        out[r] = atr
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _adx_kernel(tr, high, low, n):
+    # From bar 1 the true range equals ta's directional-movement range max(H, C[-1]) - min(L, C[-1])
+    rows, bars = tr.shape
+    size = bars - n + 1
+    out = np.empty(rows)
+    for r in range(rows):
+        trs = 0.0
+        dip = 0.0
+        din = 0.0
+        adx = 0.0
+        # Wilder smoothed sums seeded from bars 1..n; ta leaves the final element at zero so it is never used
+        for k in range(size - 1):
+            first = 1 if k == 0 else n + k
+            for i in range(first, n + k + 1):
+                dm = tr[r, i]
+                up = high[r, i] - high[r, i - 1]
+                down = low[r, i - 1] - low[r, i]
+                pos = up if (up > down and up > 0) else 0.0
+                neg = down if (down > up and down > 0) else 0.0
+                if k == 0:
+                    trs += dm
+                    dip += pos
+                    din += neg
+                else:
+                    trs = trs - trs / n + dm
+                    dip = dip - dip / n + pos
+                    din = din - din / n + neg
+            di_pos = 0.0 if trs == 0 else 100.0 * dip / trs
+            di_neg = 0.0 if trs == 0 else 100.0 * din / trs
+            di_sum = di_pos + di_neg
+            dx = 0.0 if di_sum == 0 else 100.0 * abs(di_pos - di_neg) / di_sum
+            if k < n:
+                adx += dx / n
+            else:
+                adx = (adx * (n - 1) + dx) / n
+        out[r] = 20.0 if np.isnan(adx) else adx
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _stretched_entries_kernel(prices, atrs, stretch, capital_per_pos, thresholds, ticks):
+    count = prices.shape[0]
+    limits = np.empty(count)
+    quantities = np.empty(count, dtype=np.int64)
+    for i in range(count):
+        tick = ticks[np.searchsorted(thresholds, prices[i], side='right')]
+        limit = np.round(np.round((prices[i] + stretch * atrs[i]) / tick) * tick, 3)
+        limits[i] = limit
+        quantities[i] = max(1, int(capital_per_pos / limit - 1))
+    return limits, quantities
+
+
+def stretched_entries(prices, atrs, stretch, capital_per_pos):
+    """Tick-rounded limit prices at prices + stretch * atrs, and share quantities for capital_per_pos per order.
+
+    The tick size comes from the unstretched price (as tickSize(low/high) did); quantities keep one share of headroom.
+    """
+    return _stretched_entries_kernel(
+        np.asarray(prices, dtype=np.float64),
+        np.asarray(atrs, dtype=np.float64),
+        float(stretch),
+        float(capital_per_pos),
+        TICK_THRESHOLDS,
+        TICK_SIZES,
+    )
+
+
+def roc_last(close, n):
+    """
+    Last value of the n-bar rate of change in percent, rounded to 2 decimals exactly as ROC does.
+
+    Returns a numpy float (not a Python float) for 1-D input, so later round() calls behave as they did on ROC.
+    """
+    x = _as_panel(close)
+    roc = np.round(100 * ((x[:, -1] - x[:, -1 - n]) / x[:, -1 - n]), 2)
+    return roc[0] if np.ndim(close) == 1 else roc
+
+
+def sma_last(values, n):
+    """Last value of a simple moving average over n bars."""
+    x = _as_panel(values)
+    return _unpanel(x[:, -n:].mean(axis=1), values)
+
+
+def ema_last(values, n):
+    """Last value of an exponential moving average with span n, seeded from the first bar."""
+    return _unpanel(_ema_kernel(_as_panel(values), n), values)
+
+
+def rsi_last(close, n):
+    """Last value of Wilder's RSI over n bars."""
+    return _unpanel(_rsi_kernel(_as_panel(close), n), close)
+
+
+def atr_last(high, low, close, n):
+    """Last value of the Average True Range over n bars."""
+    tr = _true_range_kernel(_as_panel(high), _as_panel(low), _as_panel(close))
+    return _unpanel(_atr_kernel(tr, n), close)
+
+
+def adx_last(high, low, close, n):
+    """Last value of the Average Directional Index over n bars."""
+    high, low = _as_panel(high), _as_panel(low)
+    tr = _true_range_kernel(high, low, _as_panel(close))
+    return _unpanel(_adx_kernel(tr, high, low, n), close)
+
+
+def atr_adx_last(high, low, close, atr_n, adx_n):
+    """Last values of ATR over atr_n bars and ADX over adx_n bars, sharing one true-range pass."""
+    high, low = _as_panel(high), _as_panel(low)
+    tr = _true_range_kernel(high, low, _as_panel(close))
+    return _unpanel(_atr_kernel(tr, atr_n), close), _unpanel(_adx_kernel(tr, high, low, adx_n), close)
+
+
+def last_bar_panel(high, low, close, volume, spec):
+    """
+    Last values of several indicators over one (symbols x bars) panel in a single call.
+
+    spec maps output names to (kind, period). 'sma', 'ema' and 'rsi' use close, 'volume_sma' and 'volume_ema' use
+    volume, and 'atr'/'adx' share one true-range pass over high/low/close. Returns {name: one value per symbol}.
+    """
+    high, low, close, volume = _as_panel(high), _as_panel(low), _as_panel(close), _as_panel(volume)
+    tr = None
+    out = {}
+    for name, (kind, period) in spec.items():
+        if kind in ('atr', 'adx') and tr is None:
+            tr = _true_range_kernel(high, low, close)
+        if kind == 'sma':
+            out[name] = close[:, -period:].mean(axis=1)
+        elif kind == 'volume_sma':
+            out[name] = volume[:, -period:].mean(axis=1)
+        elif kind == 'ema':
+            out[name] = _ema_kernel(close, period)
+        elif kind == 'volume_ema':
+            out[name] = _ema_kernel(volume, period)
+        elif kind == 'rsi':
+            out[name] = _rsi_kernel(close, period)
+        elif kind == 'atr':
+            out[name] = _atr_kernel(tr, period)
+        elif kind == 'adx':
+            out[name] = _adx_kernel(tr, high, low, period)
+        else:
+            raise ValueError(f"Unknown indicator kind: {kind}")
+    return out
+
+
+def top_n_indices(values, n):
+    """
+    Positions of the n largest values, largest first, with ties kept in their original order.
+
+    Selects the same items as heapq.nlargest(n, values) (i.e. sorted(values, reverse=True)[:n]) but partitions in
+    numpy rather than comparing in Python.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if n <= 0 or values.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if n < values.size:
+        # Everything at or above the n-th largest value, still in original order, so boundary ties resolve stably
+        cutoff = np.partition(values, values.size - n)[values.size - n]
+        candidates = np.flatnonzero(values >= cutoff)
+    else:
+        candidates = np.arange(values.size)
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order[:n]]
+
+
+def warmup():
+    """
+    Compile every kernel on a tiny panel so the numba on-disk cache is populated.
+
+    Run once after installing (python utils/indicator_utils.py) so the scheduled scans load cached machine code
+    instead of paying the JIT compile on their first indicator call. A no-op without numba.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    close = np.linspace(10.0, 11.0, 20).reshape(2, 10)
+    spec = {kind: (kind, 3) for kind in ('sma', 'ema', 'rsi', 'atr', 'adx', 'volume_sma', 'volume_ema')}
+    last_bar_panel(close + 0.5, close - 0.5, close, close * 1000, spec)
+    stretched_entries(close[:, -1], close[:, -1] / 10, 0.5, 1000.0)
+
 
+if __name__ == "__main__":
+    warmup()